@@ -1,13 +1,25 @@
 import streamlit as st
 import json
+import time
 import folium
 from folium.plugins import AntPath
-import itertools 
-import math
 from streamlit_folium import st_folium
 
 try:
     from modules.graph_algo import TobaccoGraph
+    from modules.route_solver import DEFAULT_BUDGET_MS, AUTO_EXACT_MAX_STOPS
+    from modules.distance_cache import DistanceCache, MAX_VERSIONS
+    from modules.compact_graph import CompactTobaccoGraph
+    from modules.profiler import Profiler, record
+    from modules.node_store import NodeStore
+    from modules.map_render import build_base_map, build_route_overlay
+    from modules.blocked_edges import BlockedEdges
+    from modules.route_jobs import RouteJob
+    from modules.route_cache import RouteCache
+    from modules.route_engine import (
+        MODE_GRAF, kandidat_jalur, build_graph, apply_blocked, hitung_biaya, max_stops,
+        precompute_fallbacks, reroute_blocked
+    )
 except ImportError:
     st.error("Error: File 'modules/graph_algo.py' tidak ditemukan.")
     st.stop()
@@ -19,41 +31,91 @@ USERS = {
     "karyawan@tembakau.com": {"pass": "user123", "role": "karyawan", "name": "Staff Logistik"}
 }
 
-def hitung_jarak(lat1, lon1, lat2, lon2):
-    R = 6371.0
-    lat1_rad = math.radians(lat1)
-    lon1_rad = math.radians(lon1)
-    lat2_rad = math.radians(lat2)
-    lon2_rad = math.radians(lon2)
-    dlon = lon2_rad - lon1_rad
-    dlat = lat2_rad - lat1_rad
-    a = math.sin(dlat / 2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon / 2)**2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-    return round(R * c, 2)
+BACKEND_GRAF = ["Dict (TobaccoGraph)", "Compact (CSR)"]
+MODE_PETA = ["Standar", "Skala Besar (Cluster + GeoJSON)"]
+METODE_OPTIMASI = {
+    "Otomatis": "auto",
+    "Eksak (Held-Karp)": "exact",
+    "Heuristik (2-opt + Or-opt)": "heuristic"
+}
+# Selama job rute berjalan, halaman di-rerun dengan jeda ini (progress bar tidak di-update lebih sering).
+JOB_POLL_S = 0.5
+
+@st.cache_resource(max_entries=MAX_VERSIONS)
+def load_matriks_jarak(node_names, coords):
+    # Matriks disimpan di data/cache (mmap) sehingga dipakai bersama antar proses dan tetap ada setelah restart.
+    # Jumlah entri sama dengan versi yang disimpan _prune(), supaya mmap file yang sudah dihapus ikut dilepas.
+    return DistanceCache().get_matrix(node_names, coords)
+
+@st.cache_resource(max_entries=4)
+def load_kandidat_jalur(node_names, coords, mode_graf, parameter):
+    # cache_resource: daftar sisi (O(n²) di mode Fully Connected) hanya dibaca, jadi tidak perlu di-pickle
+    # ulang di setiap rerun seperti pada cache_data.
+    matrix = None
+    if mode_graf == "Fully Connected":
+        matrix = load_matriks_jarak(node_names, coords)
+    return kandidat_jalur(node_names, coords, mode_graf, parameter, matrix)
+
+@st.cache_resource(max_entries=4)
+def load_compact_graph(data_version, mode_graf, parameter, blocked_ids, _kandidat, _rusak):
+    # Dibangun ulang hanya saat data, mode graf, atau jalur putus berubah; cache baris Dijkstra tetap terpakai
+    # di antara rerun (termasuk polling job rute).
+    edges = []
+    for u, v, jarak in _kandidat:
+        if not _rusak.contains(u, v):
+            edges.append((u, v, jarak))
+    return CompactTobaccoGraph.from_edges(edges)
+
+DEFAULT_DATA = {
+    "nodes": {
+        "Wuluhan": {"lat": -8.2289, "lon": 113.4864},
+        "Ambulu": {"lat": -8.3447, "lon": 113.6067},
+        "Balung": {"lat": -8.2611, "lon": 113.5239},
+        "Gudang_Pusat": {"lat": -8.1721, "lon": 113.7007}
+    }
+}
+
+@st.cache_resource
+def get_node_store():
+    store = NodeStore()
+    if not store.nodes():
+        store.import_data(DEFAULT_DATA)
+    return store
+
+@st.cache_resource
+def get_route_cache():
+    # Satu cache rute untuk semua sesi di proses server ini.
+    return RouteCache()
+
+@st.cache_data
+def load_tetangga(node_names, coords, mode_graf, parameter):
+    tetangga = {}
+    for u, v, _ in load_kandidat_jalur(node_names, coords, mode_graf, parameter):
+        tetangga.setdefault(u, []).append(v)
+        tetangga.setdefault(v, []).append(u)
+    return {nama: sorted(daftar) for nama, daftar in tetangga.items()}
 
 @st.cache_data
+def load_nodes(version):
+    # Di-cache per versi data, jadi penambahan node tidak perlu membuang cache lain.
+    return get_node_store().load()
+
 def load_data():
-    try:
-        with open('data/data_tembakau.json', 'r') as f: 
-            data = json.load(f)
-        return data
-    except FileNotFoundError:
-        return {
-            "nodes": {
-                "Wuluhan": {"lat": -8.2289, "lon": 113.4864},
-                "Ambulu": {"lat": -8.3447, "lon": 113.6067},
-                "Balung": {"lat": -8.2611, "lon": 113.5239},
-                "Gudang_Pusat": {"lat": -8.1721, "lon": 113.7007}
-            }
-        }
-
-def save_data(new_data):
-    import os
-    if not os.path.exists('data'):
-        os.makedirs('data')
-    with open('data/data_tembakau.json', 'w') as f:
-        json.dump(new_data, f, indent=4)
-    st.cache_data.clear()
+    version = get_node_store().version()
+    return version, load_nodes(version)
+
+@st.cache_resource(max_entries=4)
+def load_base_map(data_version, latlng_popup, _koordinat):
+    # Layer dasar hanya dibangun ulang ketika versi data node berubah.
+    return build_base_map(_koordinat, latlng_popup=latlng_popup)
+
+def route_overlay(result, koordinat, jalur_putus, data_version):
+    key = (tuple(result["full_path"]), tuple(result["sequence"]), tuple(jalur_putus), data_version)
+    cached = st.session_state.get("route_overlay")
+    if cached is None or cached[0] != key:
+        cached = (key, build_route_overlay(result, koordinat, jalur_putus))
+        st.session_state.route_overlay = cached
+    return cached[1]
 
 if 'logged_in' not in st.session_state:
     st.session_state.logged_in = False
@@ -61,6 +123,8 @@ if 'user_role' not in st.session_state:
     st.session_state.user_role = None
 if 'route_result' not in st.session_state:
     st.session_state.route_result = None
+if 'route_job' not in st.session_state:
+    st.session_state.route_job = None
 
 def login_page():
     st.markdown("<h1 style='text-align: center;'>🔐 Login Sistem Distribusi</h1>", unsafe_allow_html=True)
@@ -83,7 +147,7 @@ def login_page():
     st.info("Akun Demo: karyawan@tembakau.com / user123")
 
 def main_app():
-    data = load_data()
+    data_version, data = load_data()
     
     koordinat = {}
     for nama, info in data['nodes'].items():
@@ -96,6 +160,9 @@ def main_app():
         if st.button("Logout", type="secondary"):
             st.session_state.logged_in = False
             st.session_state.route_result = None
+            if st.session_state.route_job is not None:
+                st.session_state.route_job.cancel()
+                st.session_state.route_job = None
             st.rerun()
         
         st.markdown("---")
@@ -105,45 +172,151 @@ def main_app():
             menu_options.append("Manajemen Jalur (Bos)")
         
         menu = st.radio("Navigasi Menu", menu_options)
+
+        profiler = None
+        if st.session_state.user_role == "bos":
+            if st.checkbox("⏱️ Aktifkan Profiling", help="Catat waktu build graf, Dijkstra, dan render peta untuk setiap request."):
+                profiler = Profiler()
         
         st.markdown("---")
         
-        all_possible_routes = []
         node_names = sorted(list(koordinat.keys()))
-        
-        for u, v in itertools.combinations(node_names, 2):
-            all_possible_routes.append(f"{u} -> {v}")
 
         st.subheader("⚙️ Parameter & Simulasi")
-        
-        rusak = st.multiselect(
-            "🚧 Simulasi Jalan Putus/Macet",
-            options=all_possible_routes,
-            help="Pilih jalur untuk diputus. Karena sistem otomatis, jalur alternatif akan langsung dicari."
+
+        mode_graf = st.selectbox(
+            "🕸️ Mode Graf",
+            MODE_GRAF,
+            help="Mode sparse hanya menghubungkan titik ke tetangga terdekatnya (graf tetap dijamin terhubung)."
         )
+        parameter_graf = None
+        if mode_graf == "K-Nearest Neighbour":
+            parameter_graf = st.number_input("Jumlah Tetangga (k)", min_value=1, value=4)
+        elif mode_graf == "Radius":
+            parameter_graf = st.number_input("Radius (Km)", min_value=0.5, value=10.0)
+
+        backend_graf = st.selectbox(
+            "🧱 Backend Graf",
+            BACKEND_GRAF,
+            help="Backend Compact menyimpan adjacency dalam array datar dengan ID integer (hemat memori untuk graf besar)."
+        )
+
+        t0 = time.perf_counter()
+        kandidat = load_kandidat_jalur(
+            tuple(node_names),
+            tuple(koordinat[nama] for nama in node_names),
+            mode_graf,
+            parameter_graf
+        )
+        record(profiler, "build_edges", t0)
+
+        if "blocked_edges" not in st.session_state or st.session_state.blocked_version != data_version:
+            lama = st.session_state.get("blocked_edges")
+            st.session_state.blocked_edges = lama.remap(node_names) if lama else BlockedEdges(node_names)
+            st.session_state.blocked_version = data_version
+        rusak = st.session_state.blocked_edges
+
+        with st.expander(f"🚧 Simulasi Jalan Putus/Macet ({len(rusak)})"):
+            st.caption("Pilih titik asal lalu tujuan untuk memutus jalur. Jalur alternatif akan langsung dicari.")
+            asal = st.selectbox("Dari", node_names, key="blokir_asal")
+            if mode_graf == "Fully Connected":
+                pilihan_tujuan = [nama for nama in node_names if nama != asal]
+            else:
+                pilihan_tujuan = load_tetangga(
+                    tuple(node_names),
+                    tuple(koordinat[nama] for nama in node_names),
+                    mode_graf,
+                    parameter_graf
+                ).get(asal, [])
+            tujuan = st.selectbox("Ke", pilihan_tujuan, key="blokir_tujuan")
+            if st.button("⛔ Putus Jalur", disabled=tujuan is None):
+                rusak.add(asal, tujuan)
+                st.rerun()
+
+            for pair_id, (origin, dest) in rusak.items():
+                col_jalur, col_hapus = st.columns([4, 1])
+                col_jalur.write(f"{origin} → {dest}")
+                if col_hapus.button("✖", key=f"buka_{pair_id}", help="Buka kembali jalur ini"):
+                    rusak.discard(pair_id)
+                    st.rerun()
         
         with st.expander("💰 Konfigurasi Biaya"):
             harga_bbm = st.number_input("Harga Solar / Liter", value=6800)
             konsumsi_bbm = st.number_input("Konsumsi BBM (Km/L)", value=8)
             kecepatan = st.number_input("Kecepatan Rata-rata (Km/Jam)", value=40)
 
-    graph = TobaccoGraph()
-    
-    for u, v in itertools.combinations(node_names, 2):
-        route_name_1 = f"{u} -> {v}" 
-        route_name_2 = f"{v} -> {u}" 
-        
-        if route_name_1 not in rusak and route_name_2 not in rusak:
-            lat1, lon1 = koordinat[u]
-            lat2, lon2 = koordinat[v]
-            
-            jarak = hitung_jarak(lat1, lon1, lat2, lon2)
-            
-            graph.add_edge(u, v, jarak)
+        with st.expander("🧮 Metode Optimasi"):
+            metode = METODE_OPTIMASI[st.selectbox(
+                "Metode Urutan Titik",
+                list(METODE_OPTIMASI),
+                help=f"Otomatis memakai Held-Karp sampai {AUTO_EXACT_MAX_STOPS} titik singgah, di atas itu heuristik."
+            )]
+            budget_ms = st.number_input("Batas Waktu Heuristik (ms)", min_value=50, value=DEFAULT_BUDGET_MS, step=50)
+
+        mode_peta = st.selectbox(
+            "🗺️ Mode Peta",
+            MODE_PETA,
+            help="Mode Skala Besar mengirim semua node sebagai satu layer cluster dan hanya memperbarui overlay rute."
+        )
+
+    t0 = time.perf_counter()
+    if backend_graf == "Compact (CSR)":
+        graph = load_compact_graph(data_version, mode_graf, parameter_graf, frozenset(rusak.ids), kandidat, rusak)
+    else:
+        graph_signature = (mode_graf, parameter_graf)
+        rebuild = st.session_state.get("graph_signature") != graph_signature
+        if not rebuild and st.session_state.graph_version != data_version:
+            changes = get_node_store().changes_since(st.session_state.graph_version)
+            if mode_graf == "Fully Connected" and all(action == "add" for _, _, action in changes):
+                # Node baru cukup ditambahkan sisinya ke graf yang sudah ada.
+                baru = set(name for _, name, _ in changes)
+                st.session_state.base_graph.add_edges(e for e in kandidat if e[0] in baru or e[1] in baru)
+                st.session_state.base_graph.set_coordinates(koordinat)
+            else:
+                rebuild = True
+
+        if rebuild:
+            st.session_state.base_graph = build_graph(kandidat, koordinat)
+            st.session_state.graph_signature = graph_signature
+        st.session_state.graph_version = data_version
+
+        graph = st.session_state.base_graph
+        apply_blocked(graph, rusak.pairs())
+        graph.profiler = profiler
+    record(profiler, "build_graph", t0)
+
+    network = RouteCache.network_key((data_version, mode_graf, parameter_graf), rusak.pairs())
+
+    # Job yang sudah selesai diambil di halaman mana pun, bukan hanya di halaman rute.
+    job = st.session_state.route_job
+    if job is not None and job.done():
+        # Job dilepas sebelum hasil diambil supaya error di worker tidak terulang di setiap rerun.
+        st.session_state.route_job = None
+        if job.network != network:
+            # Jalur putus atau data titik berubah selama job berjalan: urutan dan jarak dari matriks lama
+            # tidak cocok dengan jalur yang disusun dari graf sekarang, jadi hasilnya dibuang.
+            st.warning("⚠️ Jaringan jalan berubah selama perhitungan, hasil dibuang. Silakan hitung ulang rute.")
+        else:
+            try:
+                result = job.result(graph)
+            except Exception as e:
+                st.error(f"Perhitungan rute gagal: {e}")
+            else:
+                if result["success"] and isinstance(graph, TobaccoGraph):
+                    t0 = time.perf_counter()
+                    result = precompute_fallbacks(graph, result)
+                    record(profiler, "fallback_routes", t0)
+                st.session_state.route_result = result
+                get_route_cache().put(st.session_state.route_job_key, result)
+        if profiler is not None:
+            profiler.add_time("optimize_trip", job.elapsed())
 
     if menu == "Pencarian Rute":
         st.title("🚛 Optimasi Rute Distribusi (Mode Otomatis)")
-        st.info("ℹ️ Sistem menggunakan mode **Fully Connected**. Semua titik dianggap terhubung garis lurus kecuali diblokir.")
+        if mode_graf == "Fully Connected":
+            st.info("ℹ️ Sistem menggunakan mode **Fully Connected**. Semua titik dianggap terhubung garis lurus kecuali diblokir.")
+        else:
+            st.info(f"ℹ️ Sistem menggunakan mode **{mode_graf}**. Setiap titik hanya terhubung ke tetangga terdekatnya ({len(kandidat)} jalur).")
 
         if rusak:
             st.warning(f"⚠️ {len(rusak)} jalur dinonaktifkan.")
@@ -157,11 +330,12 @@ def main_app():
             available_stops = [loc for loc in node_names if loc != start_node]
             stops = st.multiselect(
                 "Titik Singgah (Urutan akan dioptimasi)", 
-                available_stops
+                available_stops,
+                max_selections=max_stops(metode)
             )
             
-            if len(stops) == 8:
-                st.caption("⚠️ Batas maksimum titik tercapai (8 titik).")
+            if len(stops) == max_stops(metode):
+                st.caption(f"⚠️ Batas maksimum titik tercapai ({max_stops(metode)} titik).")
             
             available_ends = [loc for loc in node_names if loc != start_node and loc not in stops]
             end_node = st.selectbox("Tujuan Akhir", available_ends if available_ends else node_names)
@@ -170,77 +344,62 @@ def main_app():
             
 
         if calc_btn:
-            if len(stops) > 8:
+            if len(stops) > max_stops(metode):
                 st.error("Terlalu banyak titik singgah!")
                 st.stop()
-            best_route_sequence = []
-            best_full_path = []
-            min_total_dist = float('inf')
-            found_solution = False
-            
-            permuted_stops = list(itertools.permutations(stops))
-            if not permuted_stops:
-                permuted_stops = [()]
 
-            progress_text = "Menganalisis rute terbaik..."
-            my_bar = st.progress(0, text=progress_text)
-            
-            for idx, p_stop in enumerate(permuted_stops):
-                my_bar.progress(int((idx / len(permuted_stops)) * 100))
-                
-                current_sequence = [start_node] + list(p_stop) + [end_node]
-                current_dist = 0
-                current_full_path = []
-                valid_sequence = True
-                
-                for i in range(len(current_sequence) - 1):
-                    c_start = current_sequence[i]
-                    c_end = current_sequence[i+1]
-                    
-                    path_seg, dist_seg = graph.dijkstra(c_start, c_end)
-                    
-                    if not path_seg:
-                        valid_sequence = False
-                        break
-                    
-                    if i == 0:
-                        current_full_path.extend(path_seg)
-                    else:
-                        current_full_path.extend(path_seg[1:])
-                    
-                    current_dist += dist_seg
-                
-                if valid_sequence:
-                    if current_dist < min_total_dist:
-                        min_total_dist = current_dist
-                        best_route_sequence = current_sequence
-                        best_full_path = current_full_path
-                        found_solution = True
-            
-            my_bar.empty()
-
-            if found_solution:
-                st.session_state.route_result = {
-                    "success": True,
-                    "dist": round(min_total_dist, 2),
-                    "sequence": best_route_sequence,
-                    "full_path": best_full_path,
-                    "start": start_node,
-                    "end": end_node,
-                    "stops": stops
-                }
+            if st.session_state.route_job is not None:
+                st.session_state.route_job.cancel()
+                st.session_state.route_job = None
+
+            route_cache = get_route_cache()
+            trip_key = RouteCache.trip_key(network, start_node, stops, end_node, metode, budget_ms)
+            cached = route_cache.get(trip_key)
+            if profiler is not None:
+                profiler.count("route_cache.hit" if cached is not None else "route_cache.miss")
+
+            if cached is not None:
+                st.session_state.route_result = cached
             else:
-                st.session_state.route_result = {"success": False}
+                t0 = time.perf_counter()
+                st.session_state.route_job = RouteJob(
+                    graph, start_node, stops, end_node, metode, budget_ms,
+                    leg_distance=route_cache.leg_distance(network, graph), network=network
+                )
+                st.session_state.route_job_key = trip_key
+                st.session_state.route_result = None
+                record(profiler, "leg_matrix", t0)
+
+        job = st.session_state.route_job
+        if job is not None:
+            with col_input:
+                st.progress(job.progress, text=f"Menganalisis rute terbaik... {int(job.progress * 100)}%")
+                if st.button("⏹️ Batalkan", disabled=job.cancelled):
+                    job.cancel()
 
         if st.session_state.route_result:
             result = st.session_state.route_result
+            if result["success"] and result.get("alternatives"):
+                # Jalur putus baru setelah perhitungan: ganti ruas terdampak dengan rute cadangan.
+                result = reroute_blocked(result, rusak.contains, graph)
             
             if result["success"]:
                 with col_input:
-                    st.success("✅ Rute Optimal Ditemukan!")
-                    total_liter = result["dist"] / konsumsi_bbm
-                    total_biaya = total_liter * harga_bbm
-                    waktu_menit = (result["dist"] / kecepatan) * 60
+                    if result.get("rerouted"):
+                        ruas = ", ".join(f"{origin} → {dest}" for origin, dest in result["rerouted"])
+                        st.info(f"🔀 Rute cadangan dipakai untuk ruas: {ruas}. Urutan kunjungan tidak dihitung ulang.")
+                    if result.get("cancelled"):
+                        st.warning("⏹️ Perhitungan dibatalkan, menampilkan urutan terbaik sementara.")
+                    else:
+                        st.success("✅ Rute Optimal Ditemukan!")
+                    if result.get("method") == "heuristic":
+                        st.caption(f"Urutan dihitung secara heuristik (batas {budget_ms} ms).")
+                        if result.get("gap_pct") is not None:
+                            st.caption(f"Selisih terhadap hasil eksak: {result['gap_pct']:.2f}%")
+                    biaya = hitung_biaya(result["dist"], harga_bbm, konsumsi_bbm, kecepatan)
+                    total_liter = biaya["liter"]
+                    total_biaya = biaya["biaya"]
+                    waktu_menit = biaya["waktu_menit"]
                     
                     c1, c2 = st.columns(2)
                     c1.metric("Jarak Total", f"{result['dist']} Km")
@@ -255,21 +414,39 @@ def main_app():
                         if i == 0: icon = "🏠"
                         st.write(f"{icon} **{node}**")
 
+                    if isinstance(graph, TobaccoGraph):
+                        with st.expander("🔬 Perbandingan Mode Pencarian"):
+                            st.caption(f"Pencarian langsung {result['start']} → {result['end']}")
+                            for label, mode in [("Dijkstra", "dijkstra"), ("A*", "astar"), ("Dijkstra Dua Arah", "bidirectional")]:
+                                _, jarak_mode = graph.query(result["start"], result["end"], mode)
+                                st.write(f"**{label}**: {round(jarak_mode, 2)} Km, {graph.last_settled} node diproses")
+
                 with col_map:
                     st.markdown("### 🗺️ Visualisasi Peta")
                     
                     show_error_paths = st.checkbox("🔴 Tampilkan Jalur Error (Rusak/Macet)", value=True)
 
-                    center_lat, center_lon = koordinat[result["start"]]
-                    m = folium.Map(location=[center_lat, center_lon], zoom_start=11)
+                    t0 = time.perf_counter()
+                    if mode_peta == MODE_PETA[1]:
+                        jalur_putus = rusak.pairs() if show_error_paths else []
+                        st_folium(
+                            load_base_map(data_version, False, koordinat),
+                            feature_group_to_add=route_overlay(result, koordinat, jalur_putus, data_version),
+                            center=koordinat[result["start"]],
+                            zoom=11,
+                            width=800,
+                            height=500,
+                            key="result_map"
+                        )
+                    else:
+                        center_lat, center_lon = koordinat[result["start"]]
+                        m = folium.Map(location=[center_lat, center_lon], zoom_start=11)
                     
-                    if show_error_paths and rusak:
-                        for jalur_str in rusak:
-                            try:
-                                origin, dest = jalur_str.split(" -> ")
+                        if show_error_paths and rusak:
+                            for origin, dest in rusak.pairs():
                                 if origin in koordinat and dest in koordinat:
                                     path_coords_error = [koordinat[origin], koordinat[dest]]
-                                    
+                                
                                     folium.PolyLine(
                                         locations=path_coords_error, 
                                         color="red", 
@@ -278,7 +455,7 @@ def main_app():
                                         dash_array='10, 10', 
                                         tooltip=f"⛔ JALUR TERPUTUS: {origin} ke {dest}"
                                     ).add_to(m)
-                                    
+                                
                                     mid_lat = (koordinat[origin][0] + koordinat[dest][0]) / 2
                                     mid_lon = (koordinat[origin][1] + koordinat[dest][1]) / 2
                                     folium.Marker(
@@ -286,44 +463,43 @@ def main_app():
                                         icon=folium.Icon(color='red', icon='remove', prefix='fa'),
                                         tooltip="Blokir"
                                     ).add_to(m)
-                            except ValueError:
-                                continue
-
-                    path_coords = [koordinat[nama] for nama in result["full_path"] if nama in koordinat]
-                    if path_coords:
-                        folium.PolyLine(
-                            locations=path_coords, 
-                            color="blue", 
-                            weight=6, 
-                            opacity=0.8,
-                            tooltip="Jalur Optimal"
-                        ).add_to(m)
+
+                        path_coords = [koordinat[nama] for nama in result["full_path"] if nama in koordinat]
+                        if path_coords:
+                            folium.PolyLine(
+                                locations=path_coords, 
+                                color="blue", 
+                                weight=6, 
+                                opacity=0.8,
+                                tooltip="Jalur Optimal"
+                            ).add_to(m)
                         
-                        AntPath(
-                            locations=path_coords,
-                            dash_array=[10, 20],
-                            delay=1000,
-                            color='cyan',
-                            pulse_color='white',
-                            weight=3,
-                            opacity=0.6
-                        ).add_to(m)
+                            AntPath(
+                                locations=path_coords,
+                                dash_array=[10, 20],
+                                delay=1000,
+                                color='cyan',
+                                pulse_color='white',
+                                weight=3,
+                                opacity=0.6
+                            ).add_to(m)
                     
-                    for nama, coord in koordinat.items():
-                        color = "lightgray"; icon = "info-sign"; popup = nama
+                        for nama, coord in koordinat.items():
+                            color = "lightgray"; icon = "info-sign"; popup = nama
                         
-                        if nama == result["start"]:
-                            color = "green"; icon = "play"
-                        elif nama == result["end"]:
-                            color = "red"; icon = "flag"
-                        elif nama in result["stops"]:
-                            urutan = result["sequence"].index(nama)
-                            color = "orange"; icon = "star"
-                            popup = f"{nama} (Urutan: {urutan})"
+                            if nama == result["start"]:
+                                color = "green"; icon = "play"
+                            elif nama == result["end"]:
+                                color = "red"; icon = "flag"
+                            elif nama in result["stops"]:
+                                urutan = result["sequence"].index(nama)
+                                color = "orange"; icon = "star"
+                                popup = f"{nama} (Urutan: {urutan})"
                         
-                        folium.Marker(coord, popup=popup, icon=folium.Icon(color=color, icon=icon)).add_to(m)
+                            folium.Marker(coord, popup=popup, icon=folium.Icon(color=color, icon=icon)).add_to(m)
                     
-                    st_folium(m, width=800, height=500)
+                        st_folium(m, width=800, height=500)
+                    record(profiler, "render_map", t0)
             else:
                 st.error("❌ Jalur tidak ditemukan! Semua akses ke tujuan mungkin terblokir.")
 
@@ -336,19 +512,29 @@ def main_app():
         with tab1:
             st.markdown("### 🗺️ Pilih Lokasi di Peta")
             
-            center_lat, center_lon = -8.25, 113.6 
-            m_picker = folium.Map(location=[center_lat, center_lon], zoom_start=11)
+            t0 = time.perf_counter()
+            if mode_peta == MODE_PETA[1]:
+                map_data = st_folium(
+                    load_base_map(data_version, True, koordinat),
+                    height=400,
+                    width="100%",
+                    key="map_picker"
+                )
+            else:
+                center_lat, center_lon = -8.25, 113.6 
+                m_picker = folium.Map(location=[center_lat, center_lon], zoom_start=11)
             
-            for nama, info in data['nodes'].items():
-                folium.Marker(
-                    [info['lat'], info['lon']], 
-                    popup=f"{nama} (Sudah ada)", 
-                    icon=folium.Icon(color="gray", icon="info-sign")
-                ).add_to(m_picker)
+                for nama, info in data['nodes'].items():
+                    folium.Marker(
+                        [info['lat'], info['lon']], 
+                        popup=f"{nama} (Sudah ada)", 
+                        icon=folium.Icon(color="gray", icon="info-sign")
+                    ).add_to(m_picker)
 
-            m_picker.add_child(folium.LatLngPopup())
+                m_picker.add_child(folium.LatLngPopup())
 
-            map_data = st_folium(m_picker, height=400, width="100%", key="map_picker")
+                map_data = st_folium(m_picker, height=400, width="100%", key="map_picker")
+            record(profiler, "render_map_picker", t0)
 
             click_lat = -8.2000
             click_lon = 113.6000
@@ -376,23 +562,72 @@ def main_app():
                 
                 if st.form_submit_button("💾 Simpan Lokasi"):
                     if name and name not in data['nodes']:
-                        data['nodes'][name] = {"lat": lat, "lon": lon}
-                        save_data(data)
-                        st.success(f"✅ Lokasi '{name}' berhasil disimpan! Koordinat: {lat}, {lon}")
-                        
-                        st.session_state.pop("map_picker", None) 
-                        import time
-                        time.sleep(1) 
-                        st.rerun()
+                        try:
+                            get_node_store().add_node(name, lat, lon)
+                        except ValueError:
+                            st.error("❌ Nama lokasi sudah ada! Harap gunakan nama lain.")
+                        else:
+                            st.success(f"✅ Lokasi '{name}' berhasil disimpan! Koordinat: {lat}, {lon}")
+                            
+                            st.session_state.pop("map_picker", None) 
+                            time.sleep(1) 
+                            st.rerun()
                     elif name in data['nodes']:
                         st.error("❌ Nama lokasi sudah ada! Harap gunakan nama lain.")
                     else: 
                         st.error("❌ Nama tidak boleh kosong.")
         
         with tab3:
+            col_export, col_import = st.columns(2)
+            with col_export:
+                st.download_button(
+                    "📥 Export JSON",
+                    data=get_node_store().export_json(),
+                    file_name="data_tembakau.json",
+                    mime="application/json"
+                )
+            with col_import:
+                uploaded = st.file_uploader("📤 Import JSON", type="json")
+                if uploaded is not None and st.button("Import Data"):
+                    try:
+                        jumlah = get_node_store().import_data(json.loads(uploaded.getvalue()))
+                    except (ValueError, KeyError) as e:
+                        st.error(f"❌ File tidak valid: {e}")
+                    else:
+                        st.success(f"✅ {jumlah} lokasi diimpor.")
+                        st.rerun()
+
             st.write("Data Mentah (JSON):")
             st.json(data)
 
+    if profiler is not None:
+        with st.expander("⏱️ Performance"):
+            snapshot = profiler.snapshot()
+            st.caption(f"Request: {snapshot['request_id']}")
+            st.table([
+                {"Tahap": name, "Total (ms)": round(info["total"], 2), "Panggilan": info["calls"]}
+                for name, info in snapshot["timings_ms"].items()
+            ])
+            if snapshot["counters"]:
+                st.table([{"Penghitung": name, "Nilai": value} for name, value in snapshot["counters"].items()])
+
+            st.caption("Cache rute (semua sesi)")
+            st.table([{"Metrik": name, "Nilai": value} for name, value in get_route_cache().stats().items()])
+
+            log_lines = profiler.to_log_lines()
+            st.download_button(
+                "📥 Export Log (JSONL)",
+                data="\n".join(log_lines) + "\n",
+                file_name=f"performance_{snapshot['request_id']}.jsonl",
+                mime="application/json"
+            )
+            profiler.emit()
+
+    # Polling hanya selama halaman rute tampil; halaman lain (misalnya form tambah node) tidak ikut di-rerun.
+    if menu == "Pencarian Rute" and st.session_state.route_job is not None:
+        time.sleep(JOB_POLL_S)
+        st.rerun()
+
 if st.session_state.logged_in:
     main_app()
 else:
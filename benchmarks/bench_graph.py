@@ -0,0 +1,230 @@
+import argparse
+import itertools
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+from modules.compact_graph import CompactTobaccoGraph
+from modules.geo import matriks_jarak
+from modules.route_engine import kandidat_jalur, build_graph, optimize_trip
+
+# Kotak kira-kira wilayah Kabupaten Jember.
+LAT_RANGE = (-8.45, -8.00)
+LON_RANGE = (113.40, 113.90)
+
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+DEFAULT_BLOCKED = [0.0, 0.1, 0.3]
+DEFAULT_STOPS = [4, 8, 12, 30]
+FULLY_CONNECTED_MAX = 500
+KNN_K = 6
+PERMUTATION_MAX_STOPS = 6
+
+
+def generate_nodes(n, seed):
+    # Titik mengelompok di sekitar beberapa "kecamatan" seperti data asli.
+    rng = random.Random(seed)
+    centers = [(rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE)) for _ in range(max(3, n // 50))]
+    names = []
+    coords = []
+    for i in range(n):
+        lat, lon = rng.choice(centers)
+        names.append(f"Titik_{i:05d}")
+        coords.append((lat + rng.gauss(0, 0.03), lon + rng.gauss(0, 0.03)))
+    return names, coords
+
+
+def _summary(samples_s):
+    samples_ms = sorted(x * 1000 for x in samples_s)
+    total = sum(samples_s)
+    return {
+        "count": len(samples_ms),
+        "mean_ms": statistics.fmean(samples_ms),
+        "p50_ms": samples_ms[len(samples_ms) // 2],
+        "p95_ms": samples_ms[min(len(samples_ms) - 1, int(len(samples_ms) * 0.95))],
+        "min_ms": samples_ms[0],
+        "throughput_per_s": len(samples_s) / total if total > 0 else None
+    }
+
+
+def _peak_kb(fn):
+    # tracemalloc memperlambat eksekusi berkali lipat, jadi memori diukur di putaran terpisah dari waktu.
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def _measure(fn, repeat=1):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - t0)
+    summary = _summary(samples)
+    summary["peak_kb"] = _peak_kb(fn)
+    return summary, result
+
+
+def _permutation_search(graph, start, stops, end):
+    # Algoritma lama di app.py: Dijkstra per leg untuk setiap permutasi.
+    best = float('inf')
+    for p_stop in itertools.permutations(stops):
+        sequence = [start] + list(p_stop) + [end]
+        total = 0
+        for i in range(len(sequence) - 1):
+            path_seg, dist_seg = graph.dijkstra(sequence[i], sequence[i + 1])
+            if not path_seg:
+                total = float('inf')
+                break
+            total += dist_seg
+        best = min(best, total)
+    return best
+
+
+def bench_size(n, args, rng):
+    results = []
+    names, coords = generate_nodes(n, args.seed + n)
+    koordinat = dict(zip(names, coords))
+
+    if n <= FULLY_CONNECTED_MAX:
+        mode, parameter = "Fully Connected", None
+    else:
+        mode, parameter = "K-Nearest Neighbour", KNN_K
+
+    def build_edges():
+        matrix = matriks_jarak(coords) if mode == "Fully Connected" else None
+        return kandidat_jalur(names, coords, mode, parameter, matrix)
+
+    stats, edges = _measure(build_edges)
+    results.append({"benchmark": "build_edges", "size": n, "mode": mode, "edges": len(edges), **stats})
+
+    stats, _ = _measure(lambda: build_graph(edges, koordinat))
+    results.append({"benchmark": "build_graph", "size": n, "mode": mode, **stats})
+
+    stats, _ = _measure(lambda: CompactTobaccoGraph.from_edges(edges))
+    results.append({"benchmark": "build_compact_graph", "size": n, "mode": mode, **stats})
+
+    for ratio in args.blocked:
+        graph = build_graph(edges, koordinat)
+        for u, v, _ in rng.sample(edges, int(len(edges) * ratio)):
+            graph.remove_edge(u, v)
+        compact = CompactTobaccoGraph.from_edges(
+            (u, v, w) for u, v, w in edges if v in graph.titik[u]
+        )
+        pairs = [tuple(rng.sample(names, 2)) for _ in range(args.queries)]
+        base = {"size": n, "mode": mode, "blocked_ratio": ratio}
+
+        queries = [
+            ("query_dijkstra_lazy", lambda a, b: graph.dijkstra(a, b, "lazy")),
+            ("query_dijkstra_indexed", lambda a, b: graph.dijkstra(a, b, "indexed")),
+            ("query_astar", lambda a, b: graph.query(a, b, "astar")),
+            ("query_bidirectional", lambda a, b: graph.query(a, b, "bidirectional")),
+            ("query_compact_dijkstra", lambda a, b: compact.dijkstra(a, b)),
+        ]
+        for label, query in queries:
+            samples = []
+            settled = []
+            for a, b in pairs:
+                t0 = time.perf_counter()
+                query(a, b)
+                samples.append(time.perf_counter() - t0)
+                settled.append(graph.last_settled)
+            peak_kb = _peak_kb(lambda: [query(a, b) for a, b in pairs])
+            entry = {"benchmark": label, **base, **_summary(samples), "peak_kb": peak_kb}
+            if label in ("query_astar", "query_bidirectional"):
+                entry["mean_settled"] = statistics.fmean(settled)
+            results.append(entry)
+
+        for n_stops in args.stops:
+            if n_stops + 2 > n:
+                continue
+            chosen = rng.sample(names, n_stops + 2)
+            start, end, stops = chosen[0], chosen[1], chosen[2:]
+
+            def trip():
+                graph.clear_cache()
+                return optimize_trip(graph, start, stops, end, "auto", args.budget_ms)
+
+            stats, hasil = _measure(trip, repeat=args.trip_repeat)
+            results.append({
+                "benchmark": "trip_optimize", **base, "stops": n_stops,
+                "method": hasil.get("method"), "dist": hasil.get("dist"), **stats
+            })
+
+            if n_stops <= PERMUTATION_MAX_STOPS:
+                stats, best = _measure(lambda: _permutation_search(graph, start, stops, end))
+                results.append({
+                    "benchmark": "trip_permutation_baseline", **base, "stops": n_stops,
+                    "dist": round(best, 2), **stats
+                })
+
+    return results
+
+
+def _key(entry):
+    return (entry["benchmark"], entry["size"], entry.get("blocked_ratio"), entry.get("stops"))
+
+
+def compare(results, baseline_path):
+    with open(baseline_path, 'r') as f:
+        baseline = {_key(e): e for e in json.load(f)["results"]}
+    print(f"{'benchmark':32} {'size':>6} {'blok':>5} {'stop':>5} {'lama ms':>10} {'baru ms':>10} {'rasio':>7}")
+    for entry in results:
+        old = baseline.get(_key(entry))
+        if old is None:
+            continue
+        ratio = entry["mean_ms"] / old["mean_ms"] if old["mean_ms"] else float('nan')
+        print(f"{entry['benchmark']:32} {entry['size']:>6} {str(entry.get('blocked_ratio', '')):>5} "
+              f"{str(entry.get('stops', '')):>5} {old['mean_ms']:>10.2f} {entry['mean_ms']:>10.2f} {ratio:>7.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark graph_algo dan optimasi rute.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--blocked", type=float, nargs="+", default=DEFAULT_BLOCKED)
+    parser.add_argument("--stops", type=int, nargs="+", default=DEFAULT_STOPS)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--trip-repeat", type=int, default=1)
+    parser.add_argument("--budget-ms", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("-o", "--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="File JSON hasil run sebelumnya untuk dibandingkan.")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    results = []
+    for n in args.sizes:
+        print(f"Benchmark {n} node...", file=sys.stderr)
+        results.extend(bench_size(n, args, rng))
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "sizes": args.sizes,
+            "blocked": args.blocked,
+            "stops": args.stops,
+            "queries": args.queries
+        },
+        "results": results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=4)
+    print(f"Hasil disimpan ke {args.output}", file=sys.stderr)
+
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
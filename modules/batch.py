@@ -0,0 +1,136 @@
+import argparse
+import json
+import sys
+from multiprocessing import Pool
+
+from modules.contraction import ContractionHierarchy
+from modules.node_store import NodeStore
+from modules.route_cache import RouteCache
+from modules.route_engine import kandidat_jalur, build_graph, apply_blocked, parse_jalur, optimize_trip, hitung_biaya, MODE_GRAF
+from modules.route_solver import DEFAULT_BUDGET_MS
+
+_graph = None
+_road_index = False
+_biaya = None
+_solver = None
+_cache = None
+
+
+def _init_worker(db_path, mode_graf, parameter, biaya, solver, road_index=None):
+    # Setiap proses membangun graf dasar sekali; jalur putus per trip diterapkan sebagai delta.
+    global _graph, _road_index, _biaya, _solver, _cache
+    if road_index:
+        # Index jaringan jalan hasil modules.road_network: jarak mengikuti jalan, bukan garis lurus.
+        _graph = ContractionHierarchy.load(road_index)
+        _road_index = True
+    else:
+        data = NodeStore(db_path).load()
+
+        node_names = sorted(data['nodes'])
+        koordinat = {nama: (data['nodes'][nama]['lat'], data['nodes'][nama]['lon']) for nama in node_names}
+        coords = [koordinat[nama] for nama in node_names]
+
+        _graph = build_graph(kandidat_jalur(node_names, coords, mode_graf, parameter), koordinat)
+    _biaya = biaya
+    _solver = solver
+    _cache = RouteCache()
+
+
+def _solve(line):
+    try:
+        trip = json.loads(line)
+    except ValueError as e:
+        return {"success": False, "error": f"JSON tidak valid: {e}"}
+    if not isinstance(trip, dict):
+        return {"success": False, "error": "Trip harus berupa objek JSON."}
+
+    hasil = {"id": trip.get("id")}
+    try:
+        lokasi = [trip["start"]] + list(trip.get("stops", [])) + [trip["end"]]
+        dikenal = _graph.node_ids if _road_index else _graph.titik
+        tidak_dikenal = [nama for nama in lokasi if nama not in dikenal]
+        if tidak_dikenal:
+            raise ValueError(f"Lokasi tidak dikenal: {', '.join(tidak_dikenal)}")
+        jalur_putus = [parse_jalur(jalur_str) for jalur_str in trip.get("blocked", [])]
+        if jalur_putus and _road_index:
+            raise ValueError("Jalur putus belum didukung pada index jaringan jalan.")
+        # Graf worker tetap selama proses hidup, jadi versi jaringan cukup ditentukan oleh jalur putus.
+        network = RouteCache.network_key(None, jalur_putus)
+        key = RouteCache.trip_key(network, trip["start"], trip.get("stops", []), trip["end"], **_solver)
+        result = _cache.get(key)
+        if result is None:
+            if not _road_index:
+                apply_blocked(_graph, jalur_putus)
+            result = optimize_trip(
+                _graph, trip["start"], trip.get("stops", []), trip["end"],
+                leg_distance=_cache.leg_distance(network, _graph), **_solver
+            )
+            _cache.put(key, result)
+        elif result["success"]:
+            result = {**result, "stops": list(trip.get("stops", []))}
+    except (KeyError, ValueError) as e:
+        hasil.update({"success": False, "error": str(e)})
+        return hasil
+    except (TypeError, AttributeError) as e:
+        # Misalnya start/stops berupa objek atau angka, bukan nama lokasi.
+        hasil.update({"success": False, "error": f"Format trip tidak valid: {e}"})
+        return hasil
+
+    hasil.update(result)
+    if result["success"]:
+        biaya = hitung_biaya(result["dist"], **_biaya)
+        hasil["cost"] = round(biaya["biaya"])
+        hasil["liter"] = round(biaya["liter"], 2)
+        hasil["waktu_menit"] = int(biaya["waktu_menit"])
+    return hasil
+
+
+def _baca_trip(path):
+    f = sys.stdin if path == '-' else open(path, 'r')
+    try:
+        for line in f:
+            if line.strip():
+                yield line
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Optimasi rute distribusi tembakau secara batch (JSONL).")
+    parser.add_argument("input", help="File JSONL berisi trip: {id, start, stops, end, blocked}. Gunakan '-' untuk stdin.")
+    parser.add_argument("-o", "--output", default="-", help="File JSONL hasil (default: stdout).")
+    parser.add_argument("--db", default="data/tembakau.db", help="Database lokasi (dibuat dari data/data_tembakau.json jika belum ada).")
+    parser.add_argument("--road-index", default=None, help="Index jaringan jalan (python -m modules.road_network) sebagai pengganti graf garis lurus.")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--mode", choices=MODE_GRAF, default="Fully Connected")
+    parser.add_argument("--parameter", type=float, default=None, help="k untuk K-Nearest Neighbour atau radius (Km).")
+    parser.add_argument("--method", choices=["auto", "exact", "heuristic"], default="auto")
+    parser.add_argument("--budget-ms", type=int, default=DEFAULT_BUDGET_MS, help="Batas waktu solver heuristik per trip.")
+    parser.add_argument("--harga-bbm", type=float, default=6800)
+    parser.add_argument("--konsumsi-bbm", type=float, default=8)
+    parser.add_argument("--kecepatan", type=float, default=40)
+    args = parser.parse_args(argv)
+
+    parameter = args.parameter
+    if args.mode == "K-Nearest Neighbour":
+        parameter = int(parameter or 4)
+    elif args.mode == "Radius" and parameter is None:
+        parameter = 10.0
+
+    solver = {"method": args.method, "time_budget_ms": args.budget_ms}
+    biaya = {"harga_bbm": args.harga_bbm, "konsumsi_bbm": args.konsumsi_bbm, "kecepatan": args.kecepatan}
+    out = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        initargs = (args.db, args.mode, parameter, biaya, solver, args.road_index)
+        with Pool(args.workers, initializer=_init_worker, initargs=initargs) as pool:
+            for hasil in pool.imap(_solve, _baca_trip(args.input)):
+                out.write(json.dumps(hasil) + "\n")
+                out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
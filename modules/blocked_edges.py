@@ -0,0 +1,59 @@
+class BlockedEdges:
+    # Jalur putus disimpan sebagai ID integer pasangan node (i * n + j, dengan i < j).
+    def __init__(self, node_names):
+        self.names = list(node_names)
+        self.index = {nama: i for i, nama in enumerate(self.names)}
+        self.n = len(self.names)
+        self.ids = set()
+
+    def pair_id(self, from_node, to_node):
+        i = self.index[from_node]
+        j = self.index[to_node]
+        if i > j:
+            i, j = j, i
+        return i * self.n + j
+
+    def pair(self, pair_id):
+        i, j = divmod(pair_id, self.n)
+        return self.names[i], self.names[j]
+
+    def add(self, from_node, to_node):
+        if from_node == to_node:
+            return False
+        pair_id = self.pair_id(from_node, to_node)
+        if pair_id in self.ids:
+            return False
+        self.ids.add(pair_id)
+        return True
+
+    def discard(self, pair_id):
+        self.ids.discard(pair_id)
+
+    def clear(self):
+        self.ids = set()
+
+    def contains(self, from_node, to_node):
+        i = self.index.get(from_node)
+        j = self.index.get(to_node)
+        if i is None or j is None:
+            return False
+        if i > j:
+            i, j = j, i
+        return i * self.n + j in self.ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def items(self):
+        return [(pair_id, self.pair(pair_id)) for pair_id in sorted(self.ids)]
+
+    def pairs(self):
+        return [self.pair(pair_id) for pair_id in sorted(self.ids)]
+
+    def remap(self, node_names):
+        # Node set berubah (ID bergeser): pindahkan jalur yang kedua ujungnya masih ada.
+        baru = BlockedEdges(node_names)
+        for from_node, to_node in self.pairs():
+            if from_node in baru.index and to_node in baru.index:
+                baru.add(from_node, to_node)
+        return baru
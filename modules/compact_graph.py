@@ -0,0 +1,146 @@
+from array import array
+
+from modules.graph_algo import IndexedMinPriorityQueue
+
+INF = float('inf')
+
+
+class CompactTobaccoGraph:
+    def __init__(self):
+        self.node_ids = {}
+        self.node_names = []
+        self._pending = []
+        self.offsets = array('l', [0])
+        self.targets = array('l')
+        self.weights = array('d')
+        self._rows = {}
+
+    @classmethod
+    def from_edges(cls, edges):
+        graph = cls()
+        graph.add_edges(edges)
+        graph.build()
+        return graph
+
+    def _intern(self, name):
+        node_id = self.node_ids.get(name)
+        if node_id is None:
+            node_id = len(self.node_names)
+            self.node_ids[name] = node_id
+            self.node_names.append(name)
+        return node_id
+
+    def add_edge(self, from_node, to_node, weight):
+        self._pending.append((self._intern(from_node), self._intern(to_node), weight))
+        self._rows = {}
+
+    def add_edges(self, edges):
+        intern = self._intern
+        pending = self._pending
+        for from_node, to_node, weight in edges:
+            pending.append((intern(from_node), intern(to_node), weight))
+        self._rows = {}
+
+    def build(self):
+        if not self._pending and len(self.offsets) == len(self.node_names) + 1:
+            return
+
+        # Gabungkan sisi lama (CSR) dengan sisi baru; bobot terakhir menang seperti di TobaccoGraph.
+        n = len(self.node_names)
+        adjacency = [dict() for _ in range(n)]
+        for u in range(len(self.offsets) - 1):
+            for pos in range(self.offsets[u], self.offsets[u + 1]):
+                adjacency[u][self.targets[pos]] = self.weights[pos]
+        for u, v, weight in self._pending:
+            adjacency[u][v] = weight
+            adjacency[v][u] = weight
+        self._pending = []
+
+        offsets = array('l', [0])
+        targets = array('l')
+        weights = array('d')
+        for neighbours in adjacency:
+            targets.extend(neighbours.keys())
+            weights.extend(neighbours.values())
+            offsets.append(len(targets))
+
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+
+    def edge_count(self):
+        self.build()
+        return len(self.targets) // 2
+
+    def _dijkstra_ids(self, source, target=-1):
+        self.build()
+        offsets = self.offsets
+        targets = self.targets
+        weights = self.weights
+
+        n = len(self.node_names)
+        distances = array('d', [INF]) * n
+        previous = array('l', [-1]) * n
+        distances[source] = 0
+
+        pq = IndexedMinPriorityQueue()
+        pq.push((0, source))
+        while not pq.is_empty():
+            current_distance, u = pq.pop()
+            if u == target:
+                break
+
+            for pos in range(offsets[u], offsets[u + 1]):
+                v = targets[pos]
+                distance = current_distance + weights[pos]
+                if distance < distances[v]:
+                    distances[v] = distance
+                    previous[v] = u
+                    pq.push((distance, v))
+
+        return distances, previous
+
+    def _path_ids(self, previous, source, target):
+        path = []
+        current = target
+        while current != -1:
+            path.append(self.node_names[current])
+            if current == source:
+                break
+            current = previous[current]
+        path.reverse()
+        return path
+
+    def dijkstra(self, start_node, end_node):
+        source = self.node_ids.get(start_node)
+        target = self.node_ids.get(end_node)
+        if source is None or target is None:
+            return [], 0
+
+        distances, previous = self._dijkstra_ids(source, target)
+        if distances[target] == INF:
+            return [], 0
+        return self._path_ids(previous, source, target), distances[target]
+
+    def _row(self, source):
+        row = self._rows.get(source)
+        if row is None:
+            row = self._dijkstra_ids(source)
+            self._rows[source] = row
+        return row
+
+    def distance(self, start_node, end_node):
+        source = self.node_ids.get(start_node)
+        target = self.node_ids.get(end_node)
+        if source is None or target is None:
+            return INF
+        distances, _ = self._row(source)
+        return distances[target]
+
+    def shortest_path(self, start_node, end_node):
+        if self.distance(start_node, end_node) == INF:
+            return [], 0
+        source = self.node_ids[start_node]
+        target = self.node_ids[end_node]
+        distances, previous = self._row(source)
+        return self._path_ids(previous, source, target), distances[target]
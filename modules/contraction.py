@@ -0,0 +1,290 @@
+import heapq
+import json
+import os
+import struct
+import tempfile
+from array import array
+
+from modules.graph_algo import IndexedMinPriorityQueue
+
+INF = float('inf')
+
+MAGIC = b'TMCH'
+VERSION = 1
+HEADER = struct.Struct('<4sIQQQ')
+# Batas node yang di-settle per witness search; lebih kecil = preprocessing lebih cepat, shortcut lebih banyak.
+WITNESS_SETTLE_LIMIT = 60
+# Batas lebih kecil untuk memperkirakan prioritas (edge difference) yang dihitung jauh lebih sering.
+ESTIMATE_SETTLE_LIMIT = 10
+
+
+class ContractionHierarchy:
+    # Index contraction hierarchy untuk graf tak berarah: setiap node hanya menyimpan sisi ke node
+    # dengan rank lebih tinggi (CSR), shortcut menyimpan node tengah untuk membuka jalur aslinya.
+    def __init__(self, node_names, offsets, targets, weights, middles):
+        self.node_names = list(node_names)
+        self.node_ids = {nama: i for i, nama in enumerate(self.node_names)}
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.middles = middles
+        self.last_settled = 0
+
+    @classmethod
+    def build(cls, graph, witness_limit=WITNESS_SETTLE_LIMIT, estimate_limit=ESTIMATE_SETTLE_LIMIT):
+        node_names = list(graph.titik)
+        node_ids = {nama: i for i, nama in enumerate(node_names)}
+        n = len(node_names)
+
+        adj = [dict() for _ in range(n)]
+        for u, tetangga in graph.titik.items():
+            iu = node_ids[u]
+            for v, weight in tetangga.items():
+                iv = node_ids[v]
+                if iv != iu and weight < adj[iu].get(iv, INF):
+                    adj[iu][iv] = weight
+                    adj[iv][iu] = weight
+
+        middle = {}
+        deleted = [0] * n
+        up = [None] * n
+
+        def witness(source, skip, targets, limit, max_settled):
+            # Dijkstra lokal tanpa melewati node yang sedang dikontraksi. Dipanggil jutaan kali saat
+            # preprocessing, jadi memakai heapq (lazy) alih-alih IndexedMinPriorityQueue.
+            dist = {source: 0}
+            heap = [(0, source)]
+            sisa = len(targets)
+            settled = 0
+            while heap:
+                d, u = heapq.heappop(heap)
+                if d > dist[u]:
+                    continue
+                if d > limit or settled >= max_settled:
+                    break
+                settled += 1
+                if u in targets:
+                    sisa -= 1
+                    if sisa == 0:
+                        break
+                for v, weight in adj[u].items():
+                    if v == skip:
+                        continue
+                    nd = d + weight
+                    if nd < dist.get(v, INF):
+                        dist[v] = nd
+                        heapq.heappush(heap, (nd, v))
+            return dist
+
+        def shortcuts(v, max_settled):
+            tetangga = list(adj[v].items())
+            hasil = []
+            for i, (a, wa) in enumerate(tetangga):
+                rest = tetangga[i + 1:]
+                if not rest:
+                    break
+                limit = wa + max(wb for _, wb in rest)
+                dist = witness(a, v, set(b for b, _ in rest), limit, max_settled)
+                for b, wb in rest:
+                    if dist.get(b, INF) > wa + wb:
+                        hasil.append((a, b, wa + wb))
+            return hasil
+
+        def priority(v):
+            return len(shortcuts(v, estimate_limit)) - len(adj[v]) + deleted[v]
+
+        # Prioritas bisa naik maupun turun, jadi antrian memakai heapq dengan entri basi yang dilewati.
+        prio = [priority(v) for v in range(n)]
+        heap = [(p, v) for v, p in enumerate(prio)]
+        heapq.heapify(heap)
+
+        while heap:
+            p, v = heapq.heappop(heap)
+            if adj[v] is None or p != prio[v]:
+                continue
+            # Pembaruan lazy: kembalikan ke antrian jika ternyata bukan yang terkecil lagi.
+            baru = priority(v)
+            if heap and baru > heap[0][0]:
+                prio[v] = baru
+                heapq.heappush(heap, (baru, v))
+                continue
+
+            tambahan = shortcuts(v, witness_limit)
+            up[v] = [
+                (u, weight, middle.pop((v, u) if v < u else (u, v), -1))
+                for u, weight in adj[v].items()
+            ]
+            tetangga = list(adj[v])
+            for u in tetangga:
+                del adj[u][v]
+                deleted[u] += 1
+            for a, b, weight in tambahan:
+                if weight < adj[a].get(b, INF):
+                    adj[a][b] = weight
+                    adj[b][a] = weight
+                    middle[(a, b) if a < b else (b, a)] = v
+            adj[v] = None
+
+            # Prioritas tetangga berubah setelah kontraksi; perbarui supaya urutan tetap seimbang.
+            for u in tetangga:
+                prio[u] = priority(u)
+                heapq.heappush(heap, (prio[u], u))
+
+        offsets = array('q', [0])
+        targets = array('q')
+        weights = array('d')
+        middles = array('q')
+        for edges in up:
+            for u, weight, mid in edges:
+                targets.append(u)
+                weights.append(weight)
+                middles.append(mid)
+            offsets.append(len(targets))
+        return cls(node_names, offsets, targets, weights, middles)
+
+    def edge_count(self):
+        return len(self.targets)
+
+    def _search(self, source, target):
+        # Dua pencarian Dijkstra yang hanya naik rank; berhenti jika kunci terkecil sudah >= jarak terbaik.
+        offsets = self.offsets
+        targets = self.targets
+        weights = self.weights
+
+        dist = ({source: 0}, {target: 0})
+        prev = ({source: -1}, {target: -1})
+        queues = (IndexedMinPriorityQueue(), IndexedMinPriorityQueue())
+        queues[0].push((0, source))
+        queues[1].push((0, target))
+
+        best = INF
+        meeting = -1
+        settled = 0
+        side = 0
+        while True:
+            aktif = [s for s in (side, 1 - side) if not queues[s].is_empty() and queues[s].heap[0][0] < best]
+            if not aktif:
+                break
+            side = aktif[0]
+            d, u = queues[side].pop()
+            settled += 1
+
+            own_dist = dist[side]
+            own_prev = prev[side]
+            # Stall-on-demand: jika node lebih tinggi sudah memberi jarak lebih pendek ke u,
+            # u tidak mungkin berada di jalur terpendek dan tidak perlu diekspansi.
+            stalled = False
+            for pos in range(offsets[u], offsets[u + 1]):
+                if own_dist.get(targets[pos], INF) + weights[pos] < d:
+                    stalled = True
+                    break
+            if stalled:
+                side = 1 - side
+                continue
+
+            other = dist[1 - side].get(u)
+            if other is not None and d + other < best:
+                best = d + other
+                meeting = u
+
+            for pos in range(offsets[u], offsets[u + 1]):
+                v = targets[pos]
+                nd = d + weights[pos]
+                if nd < own_dist.get(v, INF):
+                    own_dist[v] = nd
+                    own_prev[v] = u
+                    queues[side].push((nd, v))
+            side = 1 - side
+
+        self.last_settled = settled
+        return best, meeting, prev
+
+    def _edge(self, a, b):
+        for lo, hi in ((a, b), (b, a)):
+            for pos in range(self.offsets[lo], self.offsets[lo + 1]):
+                if self.targets[pos] == hi:
+                    return pos
+        raise KeyError((a, b))
+
+    def _unpack(self, a, b, out):
+        # Buka shortcut secara iteratif supaya tidak terkena batas rekursi pada jaringan besar.
+        stack = [(a, b)]
+        while stack:
+            u, v = stack.pop()
+            mid = self.middles[self._edge(u, v)]
+            if mid == -1:
+                out.append(v)
+            else:
+                stack.append((mid, v))
+                stack.append((u, mid))
+
+    def distance(self, start_node, end_node):
+        source = self.node_ids.get(start_node)
+        target = self.node_ids.get(end_node)
+        if source is None or target is None:
+            return INF
+        if source == target:
+            return 0
+        return self._search(source, target)[0]
+
+    def shortest_path(self, start_node, end_node):
+        source = self.node_ids.get(start_node)
+        target = self.node_ids.get(end_node)
+        if source is None or target is None:
+            return [], 0
+        if source == target:
+            return [start_node], 0
+
+        best, meeting, (prev_forward, prev_backward) = self._search(source, target)
+        if meeting == -1:
+            return [], 0
+
+        naik = []
+        current = meeting
+        while current != -1:
+            naik.append(current)
+            current = prev_forward[current]
+        naik.reverse()
+        current = prev_backward[meeting]
+        while current != -1:
+            naik.append(current)
+            current = prev_backward[current]
+
+        path = [naik[0]]
+        for i in range(len(naik) - 1):
+            self._unpack(naik[i], naik[i + 1], path)
+        return [self.node_names[i] for i in path], best
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        names = json.dumps(self.node_names).encode('utf-8')
+
+        # Tulis ke file sementara lalu os.replace, sama seperti cache jarak.
+        fd, tmp_path = tempfile.mkstemp(dir=directory or '.', suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(self.node_names), len(self.targets), len(names)))
+            f.write(names)
+            self.offsets.tofile(f)
+            self.targets.tofile(f)
+            self.weights.tofile(f)
+            self.middles.tofile(f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            magic, version, n, m, names_len = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"File index jaringan jalan tidak valid: {path}")
+            node_names = json.loads(f.read(names_len).decode('utf-8'))
+            offsets = array('q')
+            offsets.fromfile(f, n + 1)
+            targets = array('q')
+            targets.fromfile(f, m)
+            weights = array('d')
+            weights.fromfile(f, m)
+            middles = array('q')
+            middles.fromfile(f, m)
+        return cls(node_names, offsets, targets, weights, middles)
@@ -0,0 +1,206 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+
+from modules.geo import hitung_jarak, matriks_jarak, blok_jarak, np
+
+MAGIC = b'TMBJ'
+VERSION = 1
+HEADER = struct.Struct('<4sII')
+# Jumlah versi matriks (node set berbeda) yang disimpan di direktori cache.
+MAX_VERSIONS = 3
+
+_META_CACHE = {}
+
+
+def fingerprint(names, coords):
+    h = hashlib.sha1()
+    for nama, (lat, lon) in zip(names, coords):
+        h.update(nama.encode('utf-8'))
+        h.update(struct.pack('<dd', lat, lon))
+    return h.hexdigest()
+
+
+class DistanceMatrix:
+    # Matriks n x n float64 yang dibaca langsung dari file lewat mmap (tanpa salinan).
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"File cache jarak tidak valid: {path}")
+        self.n = n
+        self._flat = memoryview(self._mmap)[HEADER.size:HEADER.size + n * n * 8].cast('d')
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, i):
+        return self._flat[i * self.n:(i + 1) * self.n]
+
+    def tolist(self):
+        return [self[i].tolist() for i in range(self.n)]
+
+
+class DistanceCache:
+    def __init__(self, directory='data/cache'):
+        self.directory = directory
+
+    def _paths(self, key):
+        base = os.path.join(self.directory, f"jarak_{key}")
+        return base + '.bin', base + '.json'
+
+    def get_matrix(self, names, coords):
+        names = list(names)
+        coords = [tuple(c) for c in coords]
+        key = fingerprint(names, coords)
+        bin_path, _ = self._paths(key)
+
+        if not os.path.exists(bin_path):
+            self._write(key, names, coords, self._compute(names, coords))
+            self._prune(key)
+        return DistanceMatrix(bin_path)
+
+    def _compute(self, names, coords):
+        parent = self._find_parent(names, coords)
+        if parent is None:
+            if np is not None:
+                return blok_jarak(coords, coords)
+            flat = array('d')
+            for row in matriks_jarak(coords):
+                flat.extend(row)
+            return flat
+
+        # Pakai ulang jarak antar node lama; hanya baris node baru yang dihitung.
+        parent_matrix, parent_index = parent
+        lama = [parent_index.get(nama) for nama in names]
+        baru = [i for i, pi in enumerate(lama) if pi is None]
+        if np is not None:
+            return self._compute_numpy(parent_matrix, lama, baru, coords)
+
+        n = len(names)
+        baris_baru = {}
+        for b in baru:
+            lat1, lon1 = coords[b]
+            baris_baru[b] = [hitung_jarak(lat1, lon1, lat2, lon2) for lat2, lon2 in coords]
+
+        flat = array('d')
+        for i in range(n):
+            pi = lama[i]
+            if pi is None:
+                flat.extend(baris_baru[i])
+            else:
+                prow = parent_matrix[pi]
+                flat.extend([prow[pj] if pj is not None else baris_baru[j][i] for j, pj in enumerate(lama)])
+        return flat
+
+    def _compute_numpy(self, parent_matrix, lama, baru, coords):
+        n = len(lama)
+        m = parent_matrix.n
+        parent = np.frombuffer(parent_matrix._flat, dtype=float, count=m * m).reshape(m, m)
+
+        out = np.empty((n, n))
+        posisi = [i for i, pi in enumerate(lama) if pi is not None]
+        sumber = [lama[i] for i in posisi]
+        out[np.ix_(posisi, posisi)] = parent[np.ix_(sumber, sumber)]
+        if baru:
+            rows = blok_jarak([coords[i] for i in baru], coords)
+            out[baru, :] = rows
+            out[:, baru] = rows.T
+        return out
+
+    def _read_meta(self, meta_path):
+        # Isi meta tidak pernah berubah untuk satu key (key = hash isinya), jadi cukup dibaca sekali per proses.
+        meta = _META_CACHE.get(meta_path)
+        if meta is None:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            _META_CACHE[meta_path] = meta
+        return meta
+
+    def _find_parent(self, names, coords):
+        if not os.path.isdir(self.directory):
+            return None
+
+        current = dict(zip(names, coords))
+        best = None
+        best_shared = 1
+        for filename in os.listdir(self.directory):
+            if not filename.endswith('.json'):
+                continue
+            try:
+                meta = self._read_meta(os.path.join(self.directory, filename))
+            except (OSError, ValueError):
+                continue
+
+            shared = sum(1 for nama, lat, lon in meta['nodes'] if current.get(nama) == (lat, lon))
+            if shared > best_shared:
+                best_shared = shared
+                best = meta
+
+        if best is None:
+            return None
+        bin_path, _ = self._paths(best['key'])
+        try:
+            parent_matrix = DistanceMatrix(bin_path)
+        except (OSError, ValueError):
+            return None
+
+        parent_index = {}
+        for idx, (nama, lat, lon) in enumerate(best['nodes']):
+            if current.get(nama) == (lat, lon):
+                parent_index[nama] = idx
+        return parent_matrix, parent_index
+
+    def _prune(self, keep_key):
+        # Setiap versi node set meninggalkan file n x n; simpan hanya beberapa versi terbaru.
+        versi = []
+        for filename in os.listdir(self.directory):
+            if filename.startswith('jarak_') and filename.endswith('.bin'):
+                path = os.path.join(self.directory, filename)
+                try:
+                    versi.append((os.path.getmtime(path), filename[len('jarak_'):-len('.bin')]))
+                except OSError:
+                    continue
+        versi.sort(reverse=True)
+
+        simpan = {keep_key}
+        for _, key in versi:
+            if len(simpan) >= MAX_VERSIONS:
+                break
+            simpan.add(key)
+
+        for _, key in versi:
+            if key in simpan:
+                continue
+            for path in self._paths(key):
+                _META_CACHE.pop(path, None)
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def _write(self, key, names, coords, flat):
+        os.makedirs(self.directory, exist_ok=True)
+        bin_path, meta_path = self._paths(key)
+
+        # Tulis ke file sementara lalu os.replace supaya proses lain tidak pernah membaca file setengah jadi.
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(names)))
+            flat.tofile(f)
+        os.replace(tmp_path, bin_path)
+
+        meta = {
+            "key": key,
+            "nodes": [[nama, lat, lon] for nama, (lat, lon) in zip(names, coords)]
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
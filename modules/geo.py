@@ -0,0 +1,61 @@
+import math
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+R_BUMI = 6371.0
+
+
+def hitung_jarak(lat1, lon1, lat2, lon2):
+    return round(jarak_garis_lurus(lat1, lon1, lat2, lon2), 2)
+
+
+def jarak_garis_lurus(lat1, lon1, lat2, lon2):
+    R = R_BUMI
+    lat1_rad = math.radians(lat1)
+    lon1_rad = math.radians(lon1)
+    lat2_rad = math.radians(lat2)
+    lon2_rad = math.radians(lon2)
+    dlon = lon2_rad - lon1_rad
+    dlat = lat2_rad - lat1_rad
+    a = math.sin(dlat / 2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon / 2)**2
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    return R * c
+
+
+def matriks_jarak(coords):
+    # coords: list (lat, lon) dengan urutan yang sama seperti daftar nama node.
+    if np is None:
+        return _matriks_jarak_python(coords)
+
+    if not coords:
+        return []
+    return blok_jarak(coords, coords).tolist()
+
+
+def blok_jarak(coords_a, coords_b):
+    # Matriks jarak len(a) x len(b) sebagai array NumPy (hanya dipakai jika NumPy tersedia).
+    a_rad = np.radians(np.asarray(coords_a, dtype=float).reshape(-1, 2))
+    b_rad = np.radians(np.asarray(coords_b, dtype=float).reshape(-1, 2))
+    lat_a = a_rad[:, 0]
+    lat_b = b_rad[:, 0]
+    dlat = lat_b[None, :] - lat_a[:, None]
+    dlon = b_rad[None, :, 1] - a_rad[:, 1, None]
+    a = np.sin(dlat / 2)**2 + np.cos(lat_a)[:, None] * np.cos(lat_b)[None, :] * np.sin(dlon / 2)**2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    return np.round(R_BUMI * c, 2)
+
+
+def _matriks_jarak_python(coords):
+    n = len(coords)
+    matrix = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        lat1, lon1 = coords[i]
+        for j in range(i + 1, n):
+            lat2, lon2 = coords[j]
+            jarak = hitung_jarak(lat1, lon1, lat2, lon2)
+            matrix[i][j] = jarak
+            matrix[j][i] = jarak
+    return matrix
@@ -1,3 +1,7 @@
+import time
+
+from modules.geo import jarak_garis_lurus
+
 class MinPriorityQueue:
     def __init__(self):
         self.heap = []
@@ -41,9 +45,92 @@ class MinPriorityQueue:
             self.heap[index], self.heap[smallest] = self.heap[smallest], self.heap[index]
             self._bubble_down(smallest)
 
+class IndexedMinPriorityQueue:
+    def __init__(self):
+        self.heap = []
+        self.position = {}
+
+    def push(self, item):
+        priority, key = item
+        if key in self.position:
+            self.decrease_key(key, priority)
+            return
+        self.heap.append(item)
+        self.position[key] = len(self.heap) - 1
+        self._sift_up(len(self.heap) - 1)
+
+    def pop(self):
+        if not self.heap:
+            return None
+        root = self.heap[0]
+        last = self.heap.pop()
+        del self.position[root[1]]
+        if self.heap:
+            self.heap[0] = last
+            self.position[last[1]] = 0
+            self._sift_down(0)
+        return root
+
+    def decrease_key(self, key, priority):
+        index = self.position[key]
+        if priority >= self.heap[index][0]:
+            return
+        self.heap[index] = (priority, key)
+        self._sift_up(index)
+
+    def __contains__(self, key):
+        return key in self.position
+
+    def is_empty(self):
+        return len(self.heap) == 0
+
+    def _sift_up(self, index):
+        heap = self.heap
+        position = self.position
+        item = heap[index]
+        while index > 0:
+            parent_index = (index - 1) // 2
+            parent = heap[parent_index]
+            if item[0] >= parent[0]:
+                break
+            heap[index] = parent
+            position[parent[1]] = index
+            index = parent_index
+        heap[index] = item
+        position[item[1]] = index
+
+    def _sift_down(self, index):
+        heap = self.heap
+        position = self.position
+        size = len(heap)
+        item = heap[index]
+        while True:
+            child = 2 * index + 1
+            if child >= size:
+                break
+            right = child + 1
+            if right < size and heap[right][0] < heap[child][0]:
+                child = right
+            if heap[child][0] >= item[0]:
+                break
+            heap[index] = heap[child]
+            position[heap[index][1]] = index
+            index = child
+        heap[index] = item
+        position[item[1]] = index
+
 class TobaccoGraph:
+    queue_type = "indexed"
+
     def __init__(self):
         self.titik = {}
+        self.koordinat = {}
+        self.last_settled = 0
+        self.profiler = None
+        self._matrix = None
+        self._stale = set()
+        self._removed = {}
+        self._heuristic_ratio = None
       
     def add_edge(self, from_node, to_node, weight):
         if from_node not in self.titik:
@@ -53,11 +140,94 @@ class TobaccoGraph:
             
         self.titik[from_node][to_node] = weight
         self.titik[to_node][from_node] = weight  
+        self._matrix = None
+        self._heuristic_ratio = None
+
+    def add_edges(self, edges):
+        titik = self.titik
+        for from_node, to_node, weight in edges:
+            if from_node not in titik:
+                titik[from_node] = {}
+            if to_node not in titik:
+                titik[to_node] = {}
+            titik[from_node][to_node] = weight
+            titik[to_node][from_node] = weight
+        self._matrix = None
+        self._heuristic_ratio = None
+
+    @staticmethod
+    def edge_key(from_node, to_node):
+        return (from_node, to_node) if from_node <= to_node else (to_node, from_node)
+
+    def remove_edge(self, from_node, to_node):
+        if to_node not in self.titik.get(from_node, {}):
+            return False
+
+        weight = self.titik[from_node].pop(to_node)
+        del self.titik[to_node][from_node]
+        self._removed[self.edge_key(from_node, to_node)] = weight
+
+        # Hanya baris sumber yang pohon jalur terpendeknya memakai sisi ini yang perlu dihitung ulang.
+        if self._matrix is not None:
+            _, prev = self._matrix
+            for source, prev_row in prev.items():
+                if prev_row.get(to_node) == from_node or prev_row.get(from_node) == to_node:
+                    self._stale.add(source)
+        return True
+
+    def restore_edge(self, from_node, to_node):
+        key = self.edge_key(from_node, to_node)
+        if key not in self._removed:
+            return False
+
+        weight = self._removed.pop(key)
+        self.titik[from_node][to_node] = weight
+        self.titik[to_node][from_node] = weight
+        self._heuristic_ratio = None
+
+        # Sisi yang dibuka kembali hanya mengubah baris yang jaraknya bisa diperpendek lewat sisi ini.
+        if self._matrix is not None:
+            dist, _ = self._matrix
+            for source, row in dist.items():
+                if source in self._stale:
+                    continue
+                d_from = row[from_node]
+                d_to = row[to_node]
+                if d_from + weight < d_to or d_to + weight < d_from:
+                    self._stale.add(source)
+        return True
+
+    def clear_cache(self):
+        self._matrix = None
+        self._stale = set()
+
+    def removed_edges(self):
+        return set(self._removed)
+
+    def set_coordinates(self, koordinat):
+        self.koordinat = dict(koordinat)
+        self._heuristic_ratio = None
+
+    def edge_count(self):
+        return sum(len(neighbors) for neighbors in self.titik.values()) // 2
       
-    def dijkstra(self, start_node, end_node):
+    def dijkstra(self, start_node, end_node, queue_type=None):
         if start_node not in self.titik or end_node not in self.titik:
              return [], 0
 
+        distances, previous_nodes = self._dijkstra_from(start_node, end_node, queue_type)
+                
+        if distances[end_node] == float('inf'):
+            return [], 0
+            
+        return self.buat_path(previous_nodes, start_node, end_node), distances[end_node]
+
+    def _dijkstra_from(self, start_node, end_node=None, queue_type=None):
+        if self.profiler is not None:
+            return self._dijkstra_profiled(start_node, end_node, queue_type or self.queue_type)
+        if (queue_type or self.queue_type) == "indexed":
+            return self._dijkstra_indexed(start_node, end_node)
+
         pq = MinPriorityQueue()
         pq.push((0, start_node))
         
@@ -86,12 +256,332 @@ class TobaccoGraph:
                         distances[neighbor] = distance
                         previous_nodes[neighbor] = current_node
                         pq.push((distance, neighbor))
-                
-        if distances[end_node] == float('inf'):
+
+        return distances, previous_nodes
+
+    def _dijkstra_indexed(self, start_node, end_node=None):
+        # Satu entri per node di heap; relaksasi memakai decrease_key sehingga tidak perlu set visited.
+        pq = IndexedMinPriorityQueue()
+        pq.push((0, start_node))
+
+        distances = {node: float('inf') for node in self.titik}
+        distances[start_node] = 0
+
+        previous_nodes = {node: None for node in self.titik}
+        settled = 0
+
+        while not pq.is_empty():
+            current_distance, current_node = pq.pop()
+            settled += 1
+
+            if current_node == end_node:
+                break
+
+            for neighbor, weight in self.titik[current_node].items():
+                distance = current_distance + weight
+                if distance < distances[neighbor]:
+                    distances[neighbor] = distance
+                    previous_nodes[neighbor] = current_node
+                    pq.push((distance, neighbor))
+
+        # Setiap node hanya sekali di heap, jadi jumlah pop sama dengan node yang di-settle.
+        self.last_settled = settled
+        return distances, previous_nodes
+
+    def _dijkstra_profiled(self, start_node, end_node, queue_type):
+        # Versi terpisah supaya penghitung tidak membebani jalur cepat saat profiling mati.
+        t0 = time.perf_counter()
+        pq = IndexedMinPriorityQueue() if queue_type == "indexed" else MinPriorityQueue()
+        pq.push((0, start_node))
+        pushes = 1
+        pops = 0
+        relaxed = 0
+
+        distances = {node: float('inf') for node in self.titik}
+        distances[start_node] = 0
+        previous_nodes = {node: None for node in self.titik}
+        visited = set()
+
+        while not pq.is_empty():
+            current_distance, current_node = pq.pop()
+            pops += 1
+
+            if current_node == end_node:
+                visited.add(current_node)
+                break
+            if current_node in visited:
+                continue
+            visited.add(current_node)
+
+            for neighbor, weight in self.titik[current_node].items():
+                relaxed += 1
+                distance = current_distance + weight
+                if distance < distances[neighbor]:
+                    distances[neighbor] = distance
+                    previous_nodes[neighbor] = current_node
+                    pq.push((distance, neighbor))
+                    pushes += 1
+
+        profiler = self.profiler
+        profiler.add_time("dijkstra", time.perf_counter() - t0)
+        profiler.count("dijkstra.nodes_settled", len(visited))
+        profiler.count("dijkstra.edges_relaxed", relaxed)
+        profiler.count("dijkstra.heap_pushes", pushes)
+        profiler.count("dijkstra.heap_pops", pops)
+        return distances, previous_nodes
+
+    def query(self, start_node, end_node, mode="dijkstra"):
+        if start_node not in self.titik or end_node not in self.titik:
+            self.last_settled = 0
+            return [], 0
+
+        if mode == "astar":
+            distances, previous_nodes, settled = self._astar(start_node, end_node)
+        elif mode == "bidirectional":
+            return self._bidirectional(start_node, end_node)
+        else:
+            distances, previous_nodes = self._dijkstra_indexed(start_node, end_node)
+            settled = self.last_settled
+
+        self.last_settled = settled
+        if distances.get(end_node, float('inf')) == float('inf'):
             return [], 0
-            
         return self.buat_path(previous_nodes, start_node, end_node), distances[end_node]
+
+    def _heuristic(self, node, end_node):
+        if node not in self.koordinat or end_node not in self.koordinat:
+            return 0
+        lat1, lon1 = self.koordinat[node]
+        lat2, lon2 = self.koordinat[end_node]
+        return jarak_garis_lurus(lat1, lon1, lat2, lon2) * self._ratio()
+
+    def _ratio(self):
+        # Bobot sisi dibulatkan 2 desimal, jadi sisi pendek bisa lebih murah dari garis lurusnya. Heuristik
+        # dikalikan rasio bobot/garis lurus terkecil di graf supaya tidak pernah melebihi jarak sebenarnya.
+        if self._heuristic_ratio is None:
+            koordinat = self.koordinat
+            ratio = 1.0
+            for u, neighbors in self.titik.items():
+                if u not in koordinat:
+                    ratio = 0.0
+                    break
+                lat1, lon1 = koordinat[u]
+                for v, weight in neighbors.items():
+                    if v not in koordinat:
+                        ratio = 0.0
+                        break
+                    lat2, lon2 = koordinat[v]
+                    lurus = jarak_garis_lurus(lat1, lon1, lat2, lon2)
+                    if weight < ratio * lurus:
+                        ratio = weight / lurus
+                if ratio == 0.0:
+                    break
+            self._heuristic_ratio = ratio
+        return self._heuristic_ratio
+
+    def _astar(self, start_node, end_node):
+        pq = IndexedMinPriorityQueue()
+        pq.push((self._heuristic(start_node, end_node), start_node))
+        distances = {start_node: 0}
+        previous_nodes = {start_node: None}
+        estimates = {}
+        settled = 0
+
+        while not pq.is_empty():
+            _, current_node = pq.pop()
+            settled += 1
+            if current_node == end_node:
+                break
+
+            current_distance = distances[current_node]
+            for neighbor, weight in self.titik[current_node].items():
+                distance = current_distance + weight
+                if distance < distances.get(neighbor, float('inf')):
+                    distances[neighbor] = distance
+                    previous_nodes[neighbor] = current_node
+                    if neighbor not in estimates:
+                        estimates[neighbor] = self._heuristic(neighbor, end_node)
+                    # Node yang sudah keluar dari heap boleh dibuka lagi jika ditemukan jarak yang lebih pendek.
+                    pq.push((distance + estimates[neighbor], neighbor))
+
+        return distances, previous_nodes, settled
+
+    def _bidirectional(self, start_node, end_node):
+        inf = float('inf')
+        if start_node == end_node:
+            self.last_settled = 1
+            return [start_node], 0
+
+        pq_forward = IndexedMinPriorityQueue()
+        pq_backward = IndexedMinPriorityQueue()
+        pq_forward.push((0, start_node))
+        pq_backward.push((0, end_node))
+        dist_forward = {start_node: 0}
+        dist_backward = {end_node: 0}
+        prev_forward = {start_node: None}
+        prev_backward = {end_node: None}
+        done_forward = set()
+        done_backward = set()
+
+        best = inf
+        meeting = None
+        settled = 0
+
+        while not pq_forward.is_empty() and not pq_backward.is_empty():
+            if pq_forward.heap[0][0] + pq_backward.heap[0][0] >= best:
+                break
+
+            if pq_forward.heap[0][0] <= pq_backward.heap[0][0]:
+                pq, dist, prev, done, other_dist = pq_forward, dist_forward, prev_forward, done_forward, dist_backward
+            else:
+                pq, dist, prev, done, other_dist = pq_backward, dist_backward, prev_backward, done_backward, dist_forward
+
+            current_distance, current_node = pq.pop()
+            done.add(current_node)
+            settled += 1
+
+            for neighbor, weight in self.titik[current_node].items():
+                if neighbor in done:
+                    continue
+                distance = current_distance + weight
+                if distance < dist.get(neighbor, inf):
+                    dist[neighbor] = distance
+                    prev[neighbor] = current_node
+                    pq.push((distance, neighbor))
+                if neighbor in other_dist and distance + other_dist[neighbor] < best:
+                    best = distance + other_dist[neighbor]
+                    meeting = neighbor
+
+        self.last_settled = settled
+        if meeting is None:
+            return [], 0
+
+        path = self.buat_path(prev_forward, start_node, meeting)
+        current_node = prev_backward[meeting]
+        while current_node is not None:
+            path.append(current_node)
+            current_node = prev_backward[current_node]
+        return path, best
+
+    def _row(self, source):
+        # Cache jarak per sumber: satu baris Dijkstra dihitung saat pertama diminta lalu dipakai ulang oleh
+        # distance/shortest_path sampai sisi berubah, jadi graf besar tidak perlu matriks all-pairs penuh.
+        if self._matrix is None:
+            self._matrix = ({}, {})
+        dist, prev = self._matrix
+        if source not in dist or source in self._stale:
+            dist[source], prev[source] = self._dijkstra_from(source)
+            self._stale.discard(source)
+        return dist[source], prev[source]
+
+    def distance(self, start_node, end_node):
+        if start_node not in self.titik or end_node not in self.titik:
+            return float('inf')
+        dist_row, _ = self._row(start_node)
+        return dist_row[end_node]
+
+    def shortest_path(self, start_node, end_node):
+        if self.distance(start_node, end_node) == float('inf'):
+            return [], 0
+        dist_row, prev_row = self._row(start_node)
+        return self.buat_path(prev_row, start_node, end_node), dist_row[end_node]
       
+    def k_shortest_paths(self, start_node, end_node, k=3):
+        # Yen: k jalur terpendek tanpa loop, hasil [(path, jarak)] terurut dari yang terpendek.
+        if start_node not in self.titik or end_node not in self.titik:
+            return []
+        if start_node == end_node:
+            return [([start_node], 0)]
+
+        # Pohon jalur terpendek ke end_node (graf tak berarah: baris dari end_node) dipakai
+        # ulang oleh semua spur search.
+        to_end, next_hop = self._row(end_node)
+        if to_end[start_node] == float('inf'):
+            return []
+
+        paths = [(self._tree_path(next_hop, start_node, end_node), to_end[start_node])]
+        kandidat = IndexedMinPriorityQueue()
+        seen = {tuple(paths[0][0])}
+
+        while len(paths) < k:
+            last_path = paths[-1][0]
+            root_cost = 0
+            for i in range(len(last_path) - 1):
+                spur_node = last_path[i]
+                root = last_path[:i + 1]
+
+                blocked_edges = set()
+                for path, _ in paths:
+                    if len(path) > i + 1 and path[:i + 1] == root:
+                        blocked_edges.add(self.edge_key(path[i], path[i + 1]))
+                blocked_nodes = set(root[:-1])
+
+                spur_path, spur_cost = self._spur_path(
+                    spur_node, end_node, blocked_nodes, blocked_edges, to_end, next_hop
+                )
+                if spur_path:
+                    total_path = tuple(root[:-1] + spur_path)
+                    if total_path not in seen:
+                        seen.add(total_path)
+                        kandidat.push((root_cost + spur_cost, total_path))
+                root_cost += self.titik[spur_node][last_path[i + 1]]
+
+            if kandidat.is_empty():
+                break
+            cost, path = kandidat.pop()
+            paths.append((list(path), cost))
+
+        return paths
+
+    def _tree_path(self, next_hop, node, end_node):
+        path = [node]
+        while node != end_node:
+            node = next_hop[node]
+            path.append(node)
+        return path
+
+    def _spur_path(self, spur_node, end_node, blocked_nodes, blocked_edges, to_end, next_hop):
+        # Jika jalur pohon dari spur node tidak menyentuh node/sisi terlarang, itulah spur path terpendek.
+        node = spur_node
+        utuh = True
+        while node != end_node:
+            nxt = next_hop[node]
+            if nxt is None or nxt in blocked_nodes or self.edge_key(node, nxt) in blocked_edges:
+                utuh = False
+                break
+            node = nxt
+        if utuh:
+            return self._tree_path(next_hop, spur_node, end_node), to_end[spur_node]
+
+        # Selain itu A* dengan jarak pohon sebagai heuristik: menghapus sisi/node hanya bisa
+        # memperpanjang jarak, jadi heuristik ini tetap admissible dan konsisten.
+        inf = float('inf')
+        pq = IndexedMinPriorityQueue()
+        pq.push((to_end[spur_node], spur_node))
+        distances = {spur_node: 0}
+        previous_nodes = {spur_node: None}
+        done = set()
+
+        while not pq.is_empty():
+            _, current_node = pq.pop()
+            if current_node == end_node:
+                return self.buat_path(previous_nodes, spur_node, end_node), distances[end_node]
+            done.add(current_node)
+
+            current_distance = distances[current_node]
+            for neighbor, weight in self.titik[current_node].items():
+                if neighbor in done or neighbor in blocked_nodes or to_end[neighbor] == inf:
+                    continue
+                if self.edge_key(current_node, neighbor) in blocked_edges:
+                    continue
+                distance = current_distance + weight
+                if distance < distances.get(neighbor, inf):
+                    distances[neighbor] = distance
+                    previous_nodes[neighbor] = current_node
+                    pq.push((distance + to_end[neighbor], neighbor))
+
+        return [], 0
+
     def buat_path(self, previous_nodes, start_node, end_node):
         path = []
         current_node = end_node
@@ -0,0 +1,93 @@
+import folium
+from folium.plugins import AntPath, FastMarkerCluster
+
+
+def blocked_geojson(koordinat, jalur_putus):
+    features = []
+    for origin, dest in jalur_putus:
+        if origin not in koordinat or dest not in koordinat:
+            continue
+        lat1, lon1 = koordinat[origin]
+        lat2, lon2 = koordinat[dest]
+        features.append({
+            "type": "Feature",
+            "geometry": {"type": "LineString", "coordinates": [[lon1, lat1], [lon2, lat2]]},
+            "properties": {"jalur": f"⛔ JALUR TERPUTUS: {origin} ke {dest}"}
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+
+def build_base_map(koordinat, center=None, zoom_start=11, latlng_popup=False):
+    # Layer statis: semua node dalam satu FastMarkerCluster (data dikirim sebagai satu array JS).
+    if center is None:
+        if koordinat:
+            center = [
+                sum(lat for lat, _ in koordinat.values()) / len(koordinat),
+                sum(lon for _, lon in koordinat.values()) / len(koordinat)
+            ]
+        else:
+            center = [-8.25, 113.6]
+
+    m = folium.Map(location=center, zoom_start=zoom_start)
+    callback = """
+    function (row) {
+        var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {radius: 6, color: 'gray', fillOpacity: 0.7});
+        marker.bindTooltip(row[2]);
+        return marker;
+    };
+    """
+    FastMarkerCluster(
+        [[lat, lon, nama] for nama, (lat, lon) in koordinat.items()],
+        callback=callback,
+        name="Lokasi"
+    ).add_to(m)
+
+    if latlng_popup:
+        m.add_child(folium.LatLngPopup())
+    return m
+
+
+def build_route_overlay(result, koordinat, jalur_putus=()):
+    overlay = folium.FeatureGroup(name="Rute")
+
+    blocked = blocked_geojson(koordinat, jalur_putus)
+    if blocked["features"]:
+        folium.GeoJson(
+            blocked,
+            style_function=lambda _: {"color": "red", "weight": 4, "opacity": 0.6, "dashArray": "10, 10"},
+            tooltip=folium.GeoJsonTooltip(fields=["jalur"], labels=False)
+        ).add_to(overlay)
+
+    path_coords = [koordinat[nama] for nama in result["full_path"] if nama in koordinat]
+    if path_coords:
+        folium.PolyLine(
+            locations=path_coords,
+            color="blue",
+            weight=6,
+            opacity=0.8,
+            tooltip="Jalur Optimal"
+        ).add_to(overlay)
+
+        AntPath(
+            locations=path_coords,
+            dash_array=[10, 20],
+            delay=1000,
+            color='cyan',
+            pulse_color='white',
+            weight=3,
+            opacity=0.6
+        ).add_to(overlay)
+
+    # Hanya titik yang menjadi bagian rute yang diberi marker penuh.
+    for urutan, nama in enumerate(result["sequence"]):
+        if nama not in koordinat:
+            continue
+        if nama == result["start"]:
+            color = "green"; icon = "play"; popup = nama
+        elif nama == result["end"]:
+            color = "red"; icon = "flag"; popup = nama
+        else:
+            color = "orange"; icon = "star"; popup = f"{nama} (Urutan: {urutan})"
+        folium.Marker(koordinat[nama], popup=popup, icon=folium.Icon(color=color, icon=icon)).add_to(overlay)
+
+    return overlay
@@ -0,0 +1,144 @@
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS nodes (
+    name TEXT PRIMARY KEY,
+    lat REAL NOT NULL,
+    lon REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS changes (
+    version INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    action TEXT NOT NULL,
+    changed_at REAL NOT NULL
+);
+"""
+
+
+class NodeStore:
+    def __init__(self, path='data/tembakau.db', seed_json='data/data_tembakau.json'):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            kosong = conn.execute("SELECT COUNT(*) FROM nodes").fetchone()[0] == 0
+        if kosong and seed_json and os.path.exists(seed_json):
+            self.import_json(seed_json)
+
+    @contextmanager
+    def _connect(self):
+        # WAL supaya beberapa editor/worker bisa membaca sambil ada yang menulis.
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def version(self):
+        with self._connect() as conn:
+            row = conn.execute("SELECT MAX(version) FROM changes").fetchone()
+        return row[0] or 0
+
+    def changes_since(self, version):
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT version, name, action FROM changes WHERE version > ? ORDER BY version", (version,)
+            ).fetchall()
+        return rows
+
+    def nodes(self):
+        with self._connect() as conn:
+            rows = conn.execute("SELECT name, lat, lon FROM nodes ORDER BY rowid").fetchall()
+        return {name: {"lat": lat, "lon": lon} for name, lat, lon in rows}
+
+    def load(self):
+        with self._connect() as conn:
+            meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+        data = {"nodes": self.nodes()}
+        if meta:
+            data = {"meta": meta, **data}
+        return data
+
+    def add_node(self, name, lat, lon):
+        try:
+            with self._connect() as conn:
+                conn.execute("INSERT INTO nodes (name, lat, lon) VALUES (?, ?, ?)", (name, lat, lon))
+                conn.execute(
+                    "INSERT INTO changes (name, action, changed_at) VALUES (?, 'add', ?)", (name, time.time())
+                )
+        except sqlite3.IntegrityError:
+            raise ValueError(f"Lokasi '{name}' sudah ada.")
+
+    def update_node(self, name, lat, lon):
+        with self._connect() as conn:
+            cursor = conn.execute("UPDATE nodes SET lat = ?, lon = ? WHERE name = ?", (lat, lon, name))
+            if cursor.rowcount == 0:
+                raise KeyError(name)
+            conn.execute(
+                "INSERT INTO changes (name, action, changed_at) VALUES (?, 'update', ?)", (name, time.time())
+            )
+
+    def import_json(self, path):
+        with open(path, 'r') as f:
+            return self.import_data(json.load(f))
+
+    def import_data(self, data):
+        _validasi(data)
+        jumlah = 0
+        now = time.time()
+        with self._connect() as conn:
+            existing = set(name for (name,) in conn.execute("SELECT name FROM nodes"))
+            for name, info in data.get('nodes', {}).items():
+                action = "update" if name in existing else "add"
+                conn.execute(
+                    "INSERT INTO nodes (name, lat, lon) VALUES (?, ?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET lat = excluded.lat, lon = excluded.lon",
+                    (name, info['lat'], info['lon'])
+                )
+                conn.execute(
+                    "INSERT INTO changes (name, action, changed_at) VALUES (?, ?, ?)", (name, action, now)
+                )
+                jumlah += 1
+            for key, value in data.get('meta', {}).items():
+                conn.execute(
+                    "INSERT INTO meta (key, value) VALUES (?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                    (key, str(value))
+                )
+        return jumlah
+
+    def export_json(self, path=None):
+        text = json.dumps(self.load(), indent=4)
+        if path is not None:
+            with open(path, 'w') as f:
+                f.write(text)
+        return text
+
+
+def _validasi(data):
+    # Data impor berasal dari file upload, jadi bentuknya dicek sebelum ada yang ditulis.
+    if not isinstance(data, dict):
+        raise ValueError("Data harus berupa objek JSON.")
+    nodes = data.get('nodes', {})
+    meta = data.get('meta', {})
+    if not isinstance(nodes, dict) or not isinstance(meta, dict):
+        raise ValueError("'nodes' dan 'meta' harus berupa objek.")
+    for name, info in nodes.items():
+        if not isinstance(info, dict):
+            raise ValueError(f"Data lokasi '{name}' harus berupa objek.")
+        for key in ('lat', 'lon'):
+            if isinstance(info.get(key), bool) or not isinstance(info.get(key), (int, float)):
+                raise ValueError(f"Lokasi '{name}' tidak memiliki '{key}' berupa angka.")
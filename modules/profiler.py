@@ -0,0 +1,61 @@
+import json
+import logging
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger("tembakau.perf")
+
+
+class Profiler:
+    def __init__(self, request_id=None):
+        self.request_id = request_id or time.strftime("%Y%m%d-%H%M%S")
+        self.counters = {}
+        self.timings = {}
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def add_time(self, name, seconds):
+        total, calls = self.timings.get(name, (0.0, 0))
+        self.timings[name] = (total + seconds, calls + 1)
+
+    @contextmanager
+    def timer(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - t0)
+
+    def snapshot(self):
+        return {
+            "request_id": self.request_id,
+            "timings_ms": {
+                name: {"total": total * 1000, "calls": calls}
+                for name, (total, calls) in self.timings.items()
+            },
+            "counters": dict(self.counters)
+        }
+
+    def to_log_lines(self):
+        # Satu baris JSON per metrik supaya mudah diolah oleh log collector.
+        lines = []
+        for name, (total, calls) in self.timings.items():
+            lines.append(json.dumps({
+                "request_id": self.request_id, "type": "timing", "name": name,
+                "total_ms": round(total * 1000, 3), "calls": calls
+            }))
+        for name, value in self.counters.items():
+            lines.append(json.dumps({
+                "request_id": self.request_id, "type": "counter", "name": name, "value": value
+            }))
+        return lines
+
+    def emit(self):
+        for line in self.to_log_lines():
+            logger.info(line)
+
+
+def record(profiler, name, t0):
+    if profiler is not None:
+        profiler.add_time(name, time.perf_counter() - t0)
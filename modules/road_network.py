@@ -0,0 +1,214 @@
+import argparse
+import json
+import sys
+import time
+import xml.etree.ElementTree as ET
+
+from modules.contraction import ContractionHierarchy
+from modules.geo import jarak_garis_lurus
+from modules.graph_algo import TobaccoGraph
+from modules.node_store import NodeStore
+from modules.spatial import GridIndex
+
+CHUNK_SIZE = 1 << 20
+# Jenis jalan OSM yang tidak bisa dilalui truk pengangkut tembakau.
+HIGHWAY_DIABAIKAN = {
+    "footway", "path", "steps", "cycleway", "pedestrian", "bridleway", "corridor",
+    "construction", "proposed", "platform", "elevator"
+}
+# Presisi koordinat (derajat) untuk menyatukan titik GeoJSON yang sama, kira-kira 1 cm.
+PRESISI_KOORDINAT = 7
+
+
+class RoadNetwork:
+    # Kumpulan node (id string -> (lat, lon)) dan sisi jalan yang diisi secara bertahap oleh importer.
+    def __init__(self):
+        self.koordinat = {}
+        self.edges = {}
+
+    def add_segment(self, u, v):
+        if u == v:
+            return
+        lat1, lon1 = self.koordinat[u]
+        lat2, lon2 = self.koordinat[v]
+        key = TobaccoGraph.edge_key(u, v)
+        jarak = jarak_garis_lurus(lat1, lon1, lat2, lon2)
+        if jarak < self.edges.get(key, float('inf')):
+            self.edges[key] = jarak
+
+    def edge_list(self):
+        return [(u, v, jarak) for (u, v), jarak in self.edges.items()]
+
+
+def _iter_geojson_features(f, chunk_size=CHUNK_SIZE):
+    # Baca array "features" satu objek per satu; buffer hanya menampung fitur yang sedang diproses.
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+
+    def isi():
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+        buf = buf[pos:] + chunk
+        pos = 0
+
+    while True:
+        start = buf.find('"features"', pos)
+        if start != -1:
+            bracket = buf.find('[', start)
+            if bracket != -1:
+                pos = bracket + 1
+                break
+            pos = start
+        else:
+            pos = max(pos, len(buf) - len('"features"'))
+        if eof:
+            raise ValueError("GeoJSON tidak memiliki array 'features'.")
+        isi()
+
+    while True:
+        while pos < len(buf) and buf[pos] in ' \t\r\n,':
+            pos += 1
+        if pos >= len(buf):
+            if eof:
+                raise ValueError("GeoJSON terpotong: array 'features' tidak ditutup.")
+            isi()
+            continue
+        if buf[pos] == ']':
+            return
+        try:
+            feature, end = decoder.raw_decode(buf, pos)
+        except ValueError:
+            if eof:
+                raise
+            isi()
+            continue
+        pos = end
+        yield feature
+
+
+def load_geojson(path, network=None):
+    network = network or RoadNetwork()
+    node_ids = {}
+
+    def node(lon, lat):
+        key = (round(lat, PRESISI_KOORDINAT), round(lon, PRESISI_KOORDINAT))
+        node_id = node_ids.get(key)
+        if node_id is None:
+            node_id = f"geo{len(node_ids)}"
+            node_ids[key] = node_id
+            network.koordinat[node_id] = key
+        return node_id
+
+    with open(path, 'r', encoding='utf-8') as f:
+        for feature in _iter_geojson_features(f):
+            geometry = feature.get("geometry") or {}
+            properties = feature.get("properties") or {}
+            if properties.get("highway") in HIGHWAY_DIABAIKAN:
+                continue
+            if geometry.get("type") == "LineString":
+                garis = [geometry["coordinates"]]
+            elif geometry.get("type") == "MultiLineString":
+                garis = geometry["coordinates"]
+            else:
+                continue
+            for coords in garis:
+                ids = [node(pt[0], pt[1]) for pt in coords]
+                for u, v in zip(ids, ids[1:]):
+                    network.add_segment(u, v)
+    return network
+
+
+def load_osm(path, network=None):
+    network = network or RoadNetwork()
+    # Koordinat semua node OSM perlu disimpan karena way hanya mereferensikan id node;
+    # elemen XML sendiri dibuang begitu selesai diproses.
+    posisi = {}
+    context = ET.iterparse(path, events=("start", "end"))
+    _, root = next(context)
+
+    for event, elem in context:
+        if event != "end":
+            continue
+        if elem.tag == "node":
+            posisi[elem.get("id")] = (float(elem.get("lat")), float(elem.get("lon")))
+            root.clear()
+        elif elem.tag == "way":
+            tags = {tag.get("k"): tag.get("v") for tag in elem.iter("tag")}
+            highway = tags.get("highway")
+            if highway is not None and highway not in HIGHWAY_DIABAIKAN:
+                refs = [nd.get("ref") for nd in elem.iter("nd") if nd.get("ref") in posisi]
+                ids = []
+                for ref in refs:
+                    node_id = f"osm{ref}"
+                    if node_id not in network.koordinat:
+                        network.koordinat[node_id] = posisi[ref]
+                    ids.append(node_id)
+                for u, v in zip(ids, ids[1:]):
+                    network.add_segment(u, v)
+            root.clear()
+        elif elem.tag == "relation":
+            root.clear()
+    return network
+
+
+def load_road_network(path):
+    if path.endswith(".osm") or path.endswith(".xml"):
+        return load_osm(path)
+    return load_geojson(path)
+
+
+def snap_depots(network, depots):
+    # Setiap depot dihubungkan ke node jalan terdekat; hasil: [(depot, node jalan, jarak km)].
+    road_ids = list(network.koordinat)
+    index = GridIndex([network.koordinat[node_id] for node_id in road_ids])
+    hasil = []
+    for nama, (lat, lon) in depots.items():
+        nearest = index.nearest_to(lat, lon, 1)
+        if not nearest:
+            continue
+        jarak, idx = nearest[0]
+        hasil.append((nama, road_ids[idx], jarak))
+    return hasil
+
+
+def build_road_graph(network, depots):
+    graph = TobaccoGraph()
+    graph.add_edges(network.edge_list())
+    snapped = snap_depots(network, depots)
+    graph.add_edges(snapped)
+    graph.set_coordinates({**network.koordinat, **depots})
+    return graph, snapped
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Impor jaringan jalan (GeoJSON/OSM XML) dan bangun index contraction hierarchy.")
+    parser.add_argument("input", help="File jaringan jalan (.geojson/.json atau .osm/.xml).")
+    parser.add_argument("-o", "--output", default="data/road/jaringan_jalan.ch", help="File index hasil preprocessing.")
+    parser.add_argument("--db", default="data/tembakau.db", help="Database lokasi yang di-snap ke jalan (dibuat dari data/data_tembakau.json jika belum ada).")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    network = load_road_network(args.input)
+    print(f"Jaringan jalan: {len(network.koordinat)} node, {len(network.edges)} sisi "
+          f"({time.perf_counter() - t0:.1f} s)", file=sys.stderr)
+
+    # Sama seperti worker batch: lokasi dibaca dari NodeStore supaya node yang ditambahkan lewat UI ikut di-snap.
+    data = NodeStore(args.db).load()
+    depots = {nama: (info['lat'], info['lon']) for nama, info in data['nodes'].items()}
+    graph, snapped = build_road_graph(network, depots)
+    for nama, node_id, jarak in snapped:
+        print(f"  {nama} -> {node_id} ({jarak * 1000:.0f} m)", file=sys.stderr)
+
+    t0 = time.perf_counter()
+    index = ContractionHierarchy.build(graph)
+    index.save(args.output)
+    print(f"Index disimpan ke {args.output}: {index.edge_count()} sisi naik "
+          f"({time.perf_counter() - t0:.1f} s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
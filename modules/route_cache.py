@@ -0,0 +1,93 @@
+import threading
+from collections import OrderedDict
+
+from modules.graph_algo import TobaccoGraph
+
+MAX_TRIPS = 256
+MAX_LEGS = 50000
+
+
+class RouteCache:
+    # Dipakai bersama oleh semua sesi dalam satu proses, jadi setiap akses dikunci.
+    def __init__(self, max_trips=MAX_TRIPS, max_legs=MAX_LEGS):
+        self.max_trips = max_trips
+        self.max_legs = max_legs
+        self._trips = OrderedDict()
+        self._legs = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.leg_hits = 0
+        self.leg_misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def network_key(graph_version, jalur_putus):
+        # graph_version mengidentifikasi node set + cara graf dibangun; jalur putus dinormalisasi.
+        return graph_version, frozenset(TobaccoGraph.edge_key(origin, dest) for origin, dest in jalur_putus)
+
+    @staticmethod
+    def trip_key(network, start_node, stops, end_node, method, time_budget_ms):
+        # Urutan input titik singgah tidak mempengaruhi hasil optimasi.
+        return network, start_node, tuple(sorted(stops)), end_node, method, time_budget_ms
+
+    def get(self, key):
+        with self._lock:
+            result = self._trips.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._trips.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key, result):
+        # Hasil yang dibatalkan hanya "terbaik sementara", jadi tidak disimpan.
+        if result.get("cancelled"):
+            return
+        with self._lock:
+            self._trips[key] = result
+            self._trips.move_to_end(key)
+            while len(self._trips) > self.max_trips:
+                self._trips.popitem(last=False)
+                self.evictions += 1
+
+    def leg_distance(self, network, graph):
+        # Jarak antar-pasangan titik dipakai ulang oleh trip lain pada jaringan yang sama,
+        # misalnya ketika hanya daftar titik singgah yang berubah.
+        def distance(a, b):
+            key = (network,) + TobaccoGraph.edge_key(a, b)
+            with self._lock:
+                value = self._legs.get(key)
+                if value is not None:
+                    self._legs.move_to_end(key)
+                    self.leg_hits += 1
+                    return value
+                self.leg_misses += 1
+
+            value = graph.distance(a, b)
+            with self._lock:
+                self._legs[key] = value
+                while len(self._legs) > self.max_legs:
+                    self._legs.popitem(last=False)
+            return value
+        return distance
+
+    def clear(self):
+        with self._lock:
+            self._trips.clear()
+            self._legs.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "trips": len(self._trips),
+                "legs": len(self._legs),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "leg_hits": self.leg_hits,
+                "leg_misses": self.leg_misses,
+                "evictions": self.evictions
+            }
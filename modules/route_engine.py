@@ -0,0 +1,141 @@
+import itertools
+
+from modules.graph_algo import TobaccoGraph
+from modules.route_solver import solve_stop_order, MAX_STOPS, MAX_STOPS_HEURISTIC, DEFAULT_BUDGET_MS
+from modules.spatial import sparse_edges
+from modules.distance_cache import DistanceCache
+
+MODE_GRAF = ["Fully Connected", "K-Nearest Neighbour", "Radius"]
+FALLBACK_ROUTES = 3
+
+
+def kandidat_jalur(node_names, coords, mode_graf="Fully Connected", parameter=None, matrix=None):
+    node_names = list(node_names)
+    coords = list(coords)
+    if mode_graf == "K-Nearest Neighbour":
+        return sparse_edges(node_names, coords, k=parameter)
+    if mode_graf == "Radius":
+        return sparse_edges(node_names, coords, radius_km=parameter)
+
+    if matrix is None:
+        matrix = DistanceCache().get_matrix(node_names, coords)
+    edges = []
+    for i, j in itertools.combinations(range(len(node_names)), 2):
+        edges.append((node_names[i], node_names[j], matrix[i][j]))
+    return edges
+
+
+def build_graph(edges, koordinat):
+    graph = TobaccoGraph()
+    graph.add_edges(edges)
+    graph.set_coordinates(koordinat)
+    return graph
+
+
+def parse_jalur(jalur_str):
+    origin, dest = jalur_str.split(" -> ")
+    return TobaccoGraph.edge_key(origin, dest)
+
+
+def apply_blocked(graph, jalur_putus):
+    # Terapkan hanya selisih jalur putus (pasangan nama node) terhadap kondisi graf saat ini.
+    jalur_putus = set(TobaccoGraph.edge_key(origin, dest) for origin, dest in jalur_putus)
+
+    sudah_putus = graph.removed_edges()
+    for origin, dest in jalur_putus - sudah_putus:
+        graph.remove_edge(origin, dest)
+    for origin, dest in sudah_putus - jalur_putus:
+        graph.restore_edge(origin, dest)
+
+
+def max_stops(method):
+    return MAX_STOPS if method == "exact" else MAX_STOPS_HEURISTIC
+
+
+def check_stops(stops, method):
+    if len(stops) > max_stops(method):
+        raise ValueError(f"Terlalu banyak titik singgah (maksimum {max_stops(method)}).")
+
+
+def optimize_trip(graph, start_node, stops, end_node, method="auto", time_budget_ms=DEFAULT_BUDGET_MS,
+                  progress=None, should_stop=None, leg_distance=None):
+    check_stops(stops, method)
+
+    report = {}
+    best_route_sequence, min_total_dist = solve_stop_order(
+        start_node, stops, end_node, leg_distance or graph.distance, method, time_budget_ms, report,
+        progress, should_stop
+    )
+    return trip_result(graph, best_route_sequence, min_total_dist, start_node, stops, end_node, report)
+
+
+def trip_result(graph, best_route_sequence, min_total_dist, start_node, stops, end_node, report):
+    if not best_route_sequence:
+        return {"success": False, "cancelled": report.get("cancelled", False)}
+
+    best_full_path = []
+    for i in range(len(best_route_sequence) - 1):
+        path_seg, dist_seg = graph.shortest_path(best_route_sequence[i], best_route_sequence[i+1])
+        if i == 0:
+            best_full_path.extend(path_seg)
+        else:
+            best_full_path.extend(path_seg[1:])
+
+    return {
+        "success": True,
+        "dist": round(min_total_dist, 2),
+        "sequence": best_route_sequence,
+        "full_path": best_full_path,
+        "start": start_node,
+        "end": end_node,
+        "stops": list(stops),
+        "method": report["method"],
+        "gap_pct": report.get("gap_pct"),
+        "cancelled": report.get("cancelled", False)
+    }
+
+
+def precompute_fallbacks(graph, result, k=FALLBACK_ROUTES):
+    # Simpan k jalur alternatif per ruas supaya penutupan jalan bisa ditangani tanpa menghitung ulang.
+    sequence = result["sequence"]
+    alternatives = [graph.k_shortest_paths(sequence[i], sequence[i + 1], k) for i in range(len(sequence) - 1)]
+    return {**result, "alternatives": alternatives}
+
+
+def reroute_blocked(result, is_blocked, graph):
+    # Pilih alternatif pertama per ruas yang tidak melewati jalur putus; urutan kunjungan tidak diubah.
+    full_path = []
+    total = 0
+    rerouted = []
+    sequence = result["sequence"]
+    for i, alternatif in enumerate(result["alternatives"]):
+        pilihan = None
+        for urutan, (path, dist) in enumerate(alternatif):
+            if not any(is_blocked(path[j], path[j + 1]) for j in range(len(path) - 1)):
+                pilihan = (path, dist)
+                break
+        if pilihan is None:
+            # Semua alternatif ikut terputus: cari ulang ruas ini saja di graf terkini.
+            pilihan = graph.shortest_path(sequence[i], sequence[i + 1])
+            if not pilihan[0]:
+                return {**result, "success": False}
+            urutan = None
+        if urutan != 0:
+            rerouted.append((sequence[i], sequence[i + 1]))
+
+        path, dist = pilihan
+        full_path.extend(path if i == 0 else path[1:])
+        total += dist
+
+    if not rerouted:
+        return result
+    return {**result, "dist": round(total, 2), "full_path": full_path, "rerouted": rerouted}
+
+
+def hitung_biaya(dist, harga_bbm, konsumsi_bbm, kecepatan):
+    total_liter = dist / konsumsi_bbm
+    return {
+        "liter": total_liter,
+        "biaya": total_liter * harga_bbm,
+        "waktu_menit": (dist / kecepatan) * 60
+    }
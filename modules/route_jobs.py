@@ -0,0 +1,70 @@
+import threading
+import time
+
+from modules.route_solver import build_leg_matrix, solve_leg_matrix, order_to_sequence, DEFAULT_BUDGET_MS
+from modules.route_engine import check_stops, trip_result
+
+
+class RouteJob:
+    # Optimasi urutan berjalan di thread terpisah; script Streamlit cukup membaca progres secara berkala.
+    def __init__(self, graph, start_node, stops, end_node, method="auto", time_budget_ms=DEFAULT_BUDGET_MS,
+                 leg_distance=None, network=None):
+        check_stops(stops, method)
+        # Kunci jaringan (RouteCache.network_key) saat matriks dibangun; hasil hanya valid untuk jaringan ini.
+        self.network = network
+        self.start_node = start_node
+        self.stops = list(stops)
+        self.end_node = end_node
+        self.method = method
+        self.time_budget_ms = time_budget_ms
+        self.progress = 0.0
+        self.report = {}
+        self.error = None
+        self._order = None
+        self._total = None
+        self._cancel = threading.Event()
+        self.started_at = time.perf_counter()
+        self.finished_at = None
+
+        # Matriks jarak antar-titik dihitung di thread pemanggil: worker tidak menyentuh graf
+        # yang bisa berubah (jalur putus) selama job berjalan.
+        points = [start_node] + self.stops + [end_node]
+        self._matrix = build_leg_matrix(points, leg_distance or graph.distance)
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            self._order, self._total = solve_leg_matrix(
+                self._matrix, len(self.stops), self.method, self.time_budget_ms, self.report,
+                self._set_progress, self._cancel.is_set
+            )
+        except Exception as e:
+            self.error = e
+        finally:
+            self.finished_at = time.perf_counter()
+
+    def _set_progress(self, value):
+        self.progress = min(max(value, 0.0), 1.0)
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def done(self):
+        return not self._thread.is_alive()
+
+    def elapsed(self):
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return end - self.started_at
+
+    def result(self, graph):
+        # Dipanggil setelah done(): jalur lengkap disusun di thread pemanggil.
+        if self.error is not None:
+            raise self.error
+        sequence, total = order_to_sequence(self.start_node, self.stops, self.end_node, self._order, self._total)
+        return trip_result(graph, sequence, total, self.start_node, self.stops, self.end_node, self.report)
@@ -0,0 +1,325 @@
+import random
+import time
+from operator import add, itemgetter
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+INF = float('inf')
+
+MAX_STOPS = 16
+# Batas metode "auto" memakai Held-Karp: versi NumPy sekitar 0,1 s untuk 16 titik, versi Python murni
+# sudah > 1 s pada 16 titik sehingga dibatasi 14.
+AUTO_EXACT_MAX_STOPS = 16 if np is not None else 14
+MAX_STOPS_HEURISTIC = 100
+DEFAULT_BUDGET_MS = 500
+# Untuk instance sekecil ini hasil heuristik dibandingkan dengan Held-Karp (gap dilaporkan).
+GAP_CHECK_MAX_STOPS = 10
+ILS_MAX_IDLE = 200
+# Progres/pembatalan Held-Karp dicek setiap sekian mask.
+CHECK_EVERY_MASKS = 256
+# Waktu untuk mencari urutan pengganti jika pencarian eksak dibatalkan.
+CANCEL_FALLBACK_MS = 50
+
+
+def build_leg_matrix(points, leg_distance):
+    n = len(points)
+    matrix = [[0] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(n):
+            if i != j:
+                matrix[i][j] = leg_distance(points[i], points[j])
+    return matrix
+
+
+def held_karp(d, n, progress=None, should_stop=None):
+    # Index 0 adalah start, 1..n adalah titik singgah, n + 1 adalah tujuan akhir.
+    if n == 0:
+        return [], d[0][1]
+    if np is not None:
+        return _held_karp_numpy(d, n, progress, should_stop)
+    return _held_karp_python(d, n, progress, should_stop)
+
+
+def _held_karp_numpy(d, n, progress, should_stop):
+    # DP diproses per lapisan jumlah bit: untuk setiap titik terakhir k, semua mask di lapisan
+    # yang memuat k dihitung sekaligus. Entri dp untuk j di luar mask bernilai INF sehingga
+    # otomatis tidak terpilih sebagai pendahulu.
+    full = (1 << n) - 1
+    cost = np.array([[d[j + 1][k + 1] for k in range(n)] for j in range(n)], dtype=float)
+    dp = np.full((full + 1, n), INF)
+    for j in range(n):
+        dp[1 << j, j] = d[0][j + 1]
+
+    masks = np.arange(full + 1)
+    popcount = np.zeros(full + 1, dtype=np.int64)
+    for j in range(n):
+        popcount += (masks >> j) & 1
+
+    selesai = n
+    for size in range(2, n + 1):
+        if should_stop is not None and should_stop():
+            return None, INF
+        layer = masks[popcount == size]
+        for k in range(n):
+            sel = layer[(layer >> k) & 1 == 1]
+            dp[sel, k] = (dp[sel ^ (1 << k)] + cost[:, k]).min(axis=1)
+        selesai += len(layer)
+        if progress is not None:
+            progress(selesai / full)
+
+    end_cost = np.array([d[j + 1][n + 1] for j in range(n)], dtype=float)
+    totals = dp[full] + end_cost
+    last = int(totals.argmin())
+    best = float(totals[last])
+    if best == INF:
+        return None, INF
+
+    order = [last]
+    mask = full
+    while mask & (mask - 1):
+        mask ^= 1 << last
+        last = int((dp[mask] + cost[:, last]).argmin())
+        order.append(last)
+    order.reverse()
+    return order, best
+
+
+def _held_karp_python(d, n, progress, should_stop):
+
+    full = (1 << n) - 1
+    cols = [[d[j + 1][k + 1] for j in range(n)] for k in range(n)]
+    dp = [None] * (1 << n)
+
+    for mask in range(1, full + 1):
+        if mask % CHECK_EVERY_MASKS == 0:
+            if should_stop is not None and should_stop():
+                return None, INF
+            if progress is not None:
+                progress(mask / full)
+
+        row = [INF] * n
+        dp[mask] = row
+
+        if mask & (mask - 1) == 0:
+            j = mask.bit_length() - 1
+            row[j] = d[0][j + 1]
+            continue
+
+        bits = [b for b in range(n) if mask >> b & 1]
+        pick = itemgetter(*bits)
+        for k in bits:
+            row[k] = min(map(add, pick(dp[mask ^ (1 << k)]), pick(cols[k])))
+
+    last_row = dp[full]
+    best = INF
+    last = -1
+    for j in range(n):
+        cost = last_row[j] + d[j + 1][n + 1]
+        if cost < best:
+            best = cost
+            last = j
+
+    if last == -1:
+        return None, INF
+
+    order = [last]
+    mask = full
+    while mask & (mask - 1):
+        target = dp[mask][last]
+        mask ^= 1 << last
+        before = dp[mask]
+        for j in range(n):
+            if before[j] + cols[last][j] == target:
+                last = j
+                break
+        order.append(last)
+    order.reverse()
+    return order, best
+
+
+def _path_cost(d, seq):
+    total = 0
+    for i in range(len(seq) - 1):
+        total += d[seq[i]][seq[i + 1]]
+    return total
+
+
+def _nearest_neighbour(d, n):
+    seq = [0]
+    remaining = set(range(1, n + 1))
+    current = 0
+    while remaining:
+        nxt = min(remaining, key=lambda j: d[current][j])
+        seq.append(nxt)
+        remaining.discard(nxt)
+        current = nxt
+    seq.append(n + 1)
+    return seq
+
+
+def _two_opt(d, seq, deadline):
+    # Balik segmen seq[i..k]; titik awal dan akhir tetap di tempatnya.
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, len(seq) - 2):
+            if time.perf_counter() > deadline:
+                return False
+            a = seq[i - 1]
+            b = seq[i]
+            d_ab = d[a][b]
+            for k in range(i + 1, len(seq) - 1):
+                c = seq[k]
+                e = seq[k + 1]
+                delta = d[a][c] + d[b][e] - d_ab - d[c][e]
+                if delta < -1e-9:
+                    seq[i:k + 1] = seq[i:k + 1][::-1]
+                    improved = True
+                    break
+            if improved:
+                break
+    return True
+
+
+def _or_opt(d, seq, deadline):
+    # Pindahkan segmen 1-3 titik ke posisi lain (arah segmen dipertahankan).
+    improved = True
+    any_improved = False
+    while improved:
+        improved = False
+        for length in (1, 2, 3):
+            for i in range(1, len(seq) - length):
+                if time.perf_counter() > deadline:
+                    return any_improved
+                j = i + length - 1
+                prev = seq[i - 1]
+                nxt = seq[j + 1]
+                first = seq[i]
+                last = seq[j]
+                removal_gain = d[prev][first] + d[last][nxt] - d[prev][nxt]
+                for k in range(len(seq) - 1):
+                    if i - 1 <= k <= j:
+                        continue
+                    p = seq[k]
+                    q = seq[k + 1]
+                    delta = d[p][first] + d[last][q] - d[p][q] - removal_gain
+                    if delta < -1e-9:
+                        segment = seq[i:j + 1]
+                        del seq[i:j + 1]
+                        insert_at = k + 1 if k < i else k + 1 - length
+                        seq[insert_at:insert_at] = segment
+                        improved = True
+                        any_improved = True
+                        break
+                if improved:
+                    break
+            if improved:
+                break
+    return any_improved
+
+
+def _local_search(d, seq, deadline):
+    while time.perf_counter() <= deadline:
+        _two_opt(d, seq, deadline)
+        if not _or_opt(d, seq, deadline):
+            break
+
+
+def _double_bridge(seq, rng):
+    inner = seq[1:-1]
+    if len(inner) < 8:
+        i, j = sorted(rng.sample(range(len(inner)), 2))
+        inner[i], inner[j] = inner[j], inner[i]
+        return [seq[0]] + inner + [seq[-1]]
+    a, b, c = sorted(rng.sample(range(1, len(inner)), 3))
+    return [seq[0]] + inner[:a] + inner[c:] + inner[b:c] + inner[a:b] + [seq[-1]]
+
+
+def heuristic_order(d, n, time_budget_ms=DEFAULT_BUDGET_MS, seed=0, progress=None, should_stop=None):
+    if n == 0:
+        return [], d[0][1]
+
+    t_start = time.perf_counter()
+    budget_s = time_budget_ms / 1000.0
+    deadline = t_start + budget_s
+
+    # Sisi yang tidak bisa dilalui diberi penalti besar supaya aritmetika delta tetap valid.
+    finite = [x for row in d for x in row if x != INF]
+    penalty = (max(finite) if finite else 1) * (n + 2) * 10
+    work = [[penalty if x == INF else x for x in row] for row in d]
+
+    best = _nearest_neighbour(work, n)
+    _local_search(work, best, deadline)
+    best_cost = _path_cost(work, best)
+
+    # Iterated local search: sisa waktu dipakai untuk perturbasi + perbaikan ulang,
+    # berhenti lebih awal jika lama tidak ada perbaikan atau dibatalkan (hasil terbaik sejauh ini dipakai).
+    rng = random.Random(seed)
+    idle = 0
+    while n >= 3 and idle < ILS_MAX_IDLE and time.perf_counter() < deadline:
+        if should_stop is not None and should_stop():
+            break
+        if progress is not None:
+            progress((time.perf_counter() - t_start) / budget_s if budget_s else 1.0)
+        candidate = _double_bridge(best, rng)
+        _local_search(work, candidate, deadline)
+        cost = _path_cost(work, candidate)
+        if cost < best_cost - 1e-9:
+            best = candidate
+            best_cost = cost
+            idle = 0
+        else:
+            idle += 1
+
+    total = _path_cost(d, best)
+    if total == INF:
+        return None, INF
+    return [v - 1 for v in best[1:-1]], total
+
+
+def solve_leg_matrix(d, n, method="auto", time_budget_ms=DEFAULT_BUDGET_MS, report=None, progress=None, should_stop=None):
+    if method == "auto":
+        method = "exact" if n <= AUTO_EXACT_MAX_STOPS else "heuristic"
+
+    cancelled = False
+    if method == "exact":
+        order, total = held_karp(d, n, progress, should_stop)
+        if order is None and should_stop is not None and should_stop():
+            # Held-Karp dihentikan di tengah dan tidak punya solusi parsial: ganti dengan urutan heuristik singkat.
+            # Jika pembatalan datang setelah DP selesai, hasil eksaknya tetap dipakai.
+            cancelled = True
+            order, total = heuristic_order(d, n, CANCEL_FALLBACK_MS)
+    else:
+        order, total = heuristic_order(d, n, time_budget_ms, progress=progress, should_stop=should_stop)
+        cancelled = should_stop is not None and should_stop()
+
+    if report is not None:
+        report["method"] = method
+        report["cancelled"] = cancelled
+        if method == "heuristic" and not cancelled and n <= GAP_CHECK_MAX_STOPS and total != INF:
+            _, exact_total = held_karp(d, n)
+            report["exact_dist"] = exact_total
+            report["gap_pct"] = (total - exact_total) / exact_total * 100 if exact_total else 0.0
+
+    if progress is not None:
+        progress(1.0)
+    return order, total
+
+
+def solve_stop_order(start, stops, end, leg_distance, method="auto", time_budget_ms=DEFAULT_BUDGET_MS, report=None,
+                     progress=None, should_stop=None):
+    stops = list(stops)
+    points = [start] + stops + [end]
+    d = build_leg_matrix(points, leg_distance)
+
+    order, total = solve_leg_matrix(d, len(stops), method, time_budget_ms, report, progress, should_stop)
+    return order_to_sequence(start, stops, end, order, total)
+
+
+def order_to_sequence(start, stops, end, order, total):
+    if order is None or total == INF:
+        return [], INF
+    return [start] + [stops[i] for i in order] + [end], total
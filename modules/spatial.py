@@ -0,0 +1,156 @@
+import math
+
+from modules.geo import hitung_jarak
+
+KM_PER_DERAJAT = 111.32
+
+
+class GridIndex:
+    def __init__(self, coords, cell_deg=None):
+        self.coords = list(coords)
+        if cell_deg is None:
+            cell_deg = self._auto_cell(self.coords)
+        self.cell_deg = cell_deg
+
+        max_lat = max((abs(lat) for lat, _ in self.coords), default=0.0)
+        # Sisi sel terpendek dalam km (arah bujur menyusut dengan cos lintang).
+        self.cell_km = cell_deg * KM_PER_DERAJAT * math.cos(math.radians(min(max_lat, 89.0)))
+
+        self.buckets = {}
+        for idx, (lat, lon) in enumerate(self.coords):
+            self.buckets.setdefault(self._cell(lat, lon), []).append(idx)
+
+    @staticmethod
+    def _auto_cell(coords):
+        if len(coords) < 2:
+            return 0.01
+        lats = [lat for lat, _ in coords]
+        lons = [lon for _, lon in coords]
+        area = max(max(lats) - min(lats), 1e-6) * max(max(lons) - min(lons), 1e-6)
+        # Rata-rata sekitar dua titik per sel.
+        return max(math.sqrt(area * 2 / len(coords)), 1e-4)
+
+    def _cell(self, lat, lon):
+        return (math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg))
+
+    def _ring(self, cell, r):
+        ci, cj = cell
+        if r == 0:
+            yield cell
+            return
+        for dj in range(-r, r + 1):
+            yield (ci - r, cj + dj)
+            yield (ci + r, cj + dj)
+        for di in range(-r + 1, r):
+            yield (ci + di, cj - r)
+            yield (ci + di, cj + r)
+
+    def nearest(self, idx, k, exclude=None):
+        lat, lon = self.coords[idx]
+        return self._nearest(lat, lon, k, idx, exclude)
+
+    def nearest_to(self, lat, lon, k=1):
+        # Untuk titik yang bukan bagian dari index (misalnya depot yang di-snap ke jaringan jalan).
+        return self._nearest(lat, lon, k, -1, None)
+
+    def _nearest(self, lat, lon, k, idx, exclude):
+        cell = self._cell(lat, lon)
+        total = len(self.coords)
+        seen = 0
+        found = []
+        r = 0
+        while seen < total:
+            for c in self._ring(cell, r):
+                for other in self.buckets.get(c, ()):
+                    seen += 1
+                    if other == idx or (exclude is not None and other in exclude):
+                        continue
+                    olat, olon = self.coords[other]
+                    found.append((hitung_jarak(lat, lon, olat, olon), other))
+            # Titik di luar ring r pasti berjarak minimal r sel dari titik asal.
+            if len(found) >= k:
+                found.sort()
+                if found[k - 1][0] <= r * self.cell_km:
+                    break
+            r += 1
+        found.sort()
+        return found[:k]
+
+    def within(self, idx, radius_km):
+        lat, lon = self.coords[idx]
+        ci, cj = self._cell(lat, lon)
+        reach = int(radius_km / self.cell_km) + 1 if self.cell_km > 0 else len(self.coords)
+        hasil = []
+        for di in range(-reach, reach + 1):
+            for dj in range(-reach, reach + 1):
+                for other in self.buckets.get((ci + di, cj + dj), ()):
+                    if other == idx:
+                        continue
+                    olat, olon = self.coords[other]
+                    jarak = hitung_jarak(lat, lon, olat, olon)
+                    if jarak <= radius_km:
+                        hasil.append((jarak, other))
+        return hasil
+
+
+class _UnionFind:
+    def __init__(self, n):
+        self.parent = list(range(n))
+
+    def find(self, x):
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return False
+        self.parent[ra] = rb
+        return True
+
+
+def sparse_edges(names, coords, k=None, radius_km=None):
+    index = GridIndex(coords)
+    n = len(names)
+    uf = _UnionFind(n)
+    edges = {}
+
+    for i in range(n):
+        if k is not None:
+            kandidat = index.nearest(i, k)
+        else:
+            kandidat = index.within(i, radius_km)
+        for jarak, j in kandidat:
+            key = (i, j) if i < j else (j, i)
+            edges[key] = jarak
+            uf.union(i, j)
+
+    _sambung_komponen(index, uf, edges, n)
+
+    return [(names[i], names[j], jarak) for (i, j), jarak in edges.items()]
+
+
+def _sambung_komponen(index, uf, edges, n):
+    # Hubungkan tiap komponen terpisah ke titik terdekat di luar komponennya
+    # sampai graf terhubung.
+    while True:
+        komponen = {}
+        for i in range(n):
+            komponen.setdefault(uf.find(i), []).append(i)
+        if len(komponen) <= 1:
+            return
+
+        anggota = min(komponen.values(), key=len)
+        exclude = set(anggota)
+        best = None
+        for i in anggota:
+            terdekat = index.nearest(i, 1, exclude=exclude)
+            if terdekat and (best is None or terdekat[0][0] < best[0]):
+                best = (terdekat[0][0], i, terdekat[0][1])
+
+        jarak, i, j = best
+        key = (i, j) if i < j else (j, i)
+        edges[key] = jarak
+        uf.union(i, j)
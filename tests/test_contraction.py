@@ -0,0 +1,77 @@
+import random
+
+import pytest
+
+from benchmarks.bench_graph import generate_nodes
+from modules.contraction import ContractionHierarchy
+from modules.graph_algo import TobaccoGraph
+from modules.route_engine import build_graph, kandidat_jalur
+
+
+def _grid(sisi, seed):
+    rng = random.Random(seed)
+    graph = TobaccoGraph()
+    for r in range(sisi):
+        for c in range(sisi):
+            if c + 1 < sisi:
+                graph.add_edge(f"{r},{c}", f"{r},{c + 1}", round(rng.uniform(0.1, 2.0), 2))
+            if r + 1 < sisi:
+                graph.add_edge(f"{r},{c}", f"{r + 1},{c}", round(rng.uniform(0.1, 2.0), 2))
+    return graph
+
+
+def _knn(n, k, seed):
+    names, coords = generate_nodes(n, seed)
+    return build_graph(kandidat_jalur(names, coords, "K-Nearest Neighbour", k), dict(zip(names, coords)))
+
+
+def _cek_sama_dengan_dijkstra(graph, index, pairs):
+    for a, b in pairs:
+        _, expected = graph.dijkstra(a, b)
+        assert abs(index.distance(a, b) - expected) < 1e-9
+
+        path, jarak = index.shortest_path(a, b)
+        assert abs(jarak - expected) < 1e-9
+        if a == b:
+            assert path == [a]
+            continue
+        assert path[0] == a and path[-1] == b
+        # Setiap langkah harus sisi asli graf (shortcut sudah dibuka) dan totalnya sama dengan jaraknya.
+        assert abs(sum(graph.titik[u][v] for u, v in zip(path, path[1:])) - expected) < 1e-9
+
+
+@pytest.mark.parametrize("buat_graf", [
+    lambda: _grid(30, 1),
+    lambda: _knn(400, 3, 2),
+    lambda: _knn(400, 6, 3),
+], ids=["grid900", "knn3", "knn6"])
+def test_ch_sama_dengan_dijkstra_dan_bertahan_save_load(buat_graf, tmp_path):
+    graph = buat_graf()
+    rng = random.Random(5)
+    names = list(graph.titik)
+    pairs = [tuple(rng.sample(names, 2)) for _ in range(80)] + [(names[0], names[0])]
+
+    index = ContractionHierarchy.build(graph)
+    _cek_sama_dengan_dijkstra(graph, index, pairs)
+
+    path = tmp_path / "jaringan.ch"
+    index.save(str(path))
+    _cek_sama_dengan_dijkstra(graph, ContractionHierarchy.load(str(path)), pairs)
+
+
+def test_ch_node_tidak_dikenal_dan_tidak_terhubung():
+    graph = TobaccoGraph()
+    graph.add_edge("A", "B", 1.0)
+    graph.add_edge("C", "D", 2.0)
+    index = ContractionHierarchy.build(graph)
+    assert index.distance("A", "D") == float('inf')
+    assert index.shortest_path("A", "D") == ([], 0)
+    assert index.distance("A", "X") == float('inf')
+    assert index.shortest_path("X", "A") == ([], 0)
+
+
+def test_ch_load_menolak_file_lain(tmp_path):
+    path = tmp_path / "bukan.ch"
+    path.write_bytes(b"XXXX" + bytes(64))
+    with pytest.raises(ValueError):
+        ContractionHierarchy.load(str(path))
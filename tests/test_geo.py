@@ -0,0 +1,40 @@
+import random
+
+import pytest
+
+from modules import geo
+from modules.geo import hitung_jarak, matriks_jarak, _matriks_jarak_python
+
+# Kotak kira-kira wilayah Kabupaten Jember.
+LAT_RANGE = (-8.45, -8.00)
+LON_RANGE = (113.40, 113.90)
+
+
+def _coords(n, seed=42):
+    rng = random.Random(seed)
+    return [(rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE)) for _ in range(n)]
+
+
+def _expected(coords):
+    return [[hitung_jarak(lat1, lon1, lat2, lon2) if i != j else 0.0
+             for j, (lat2, lon2) in enumerate(coords)]
+            for i, (lat1, lon1) in enumerate(coords)]
+
+
+@pytest.mark.parametrize("n", [0, 1, 2, 50])
+def test_matriks_jarak_python_sama_dengan_hitung_jarak(n):
+    coords = _coords(n)
+    assert _matriks_jarak_python(coords) == _expected(coords)
+
+
+@pytest.mark.skipif(geo.np is None, reason="NumPy tidak terpasang")
+@pytest.mark.parametrize("n", [0, 1, 2, 50])
+def test_matriks_jarak_numpy_sama_dengan_hitung_jarak(n):
+    coords = _coords(n)
+    assert matriks_jarak(coords) == _expected(coords)
+
+
+def test_matriks_jarak_tanpa_numpy(monkeypatch):
+    coords = _coords(20, seed=7)
+    monkeypatch.setattr(geo, "np", None)
+    assert matriks_jarak(coords) == _expected(coords)
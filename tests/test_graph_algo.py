@@ -0,0 +1,83 @@
+import math
+import random
+
+from modules.geo import hitung_jarak
+from modules.graph_algo import TobaccoGraph
+
+
+def _garis_lurus_pendek():
+    # 10 ruas segaris ~0.205 km (dibulatkan 0.20) ditambah jalan memutar P0-Q-P10 sepanjang 2.02 km.
+    lat0, lon0 = -8.2, 113.5
+    step = 0.205 / 111.195 / math.cos(math.radians(lat0))
+    koordinat = {f"P{i}": (lat0, lon0 + step * i) for i in range(11)}
+    koordinat["Q"] = (lat0 + 0.0001, koordinat["P10"][1] - 0.0003)
+
+    graph = TobaccoGraph()
+    for i in range(10):
+        a, b = f"P{i}", f"P{i + 1}"
+        graph.add_edge(a, b, hitung_jarak(*koordinat[a], *koordinat[b]))
+    graph.add_edge("P0", "Q", 1.90)
+    graph.add_edge("Q", "P10", 0.12)
+    graph.set_coordinates(koordinat)
+    return graph
+
+
+def test_astar_tetap_optimal_dengan_bobot_dibulatkan():
+    graph = _garis_lurus_pendek()
+    path, jarak = graph.query("P0", "P10", "astar")
+    _, expected = graph.dijkstra("P0", "P10")
+    assert abs(jarak - expected) < 1e-9
+    assert path == [f"P{i}" for i in range(11)]
+
+
+def _graf_acak(n, m, seed):
+    rng = random.Random(seed)
+    names = [f"N{i}" for i in range(n)]
+    edges = {}
+    for i in range(1, n):
+        # Pohon acak dulu supaya graf awal terhubung, lalu sisi tambahan.
+        edges[TobaccoGraph.edge_key(names[i], names[rng.randrange(i)])] = round(rng.uniform(0.5, 10), 2)
+    while len(edges) < m:
+        a, b = rng.sample(names, 2)
+        edges[TobaccoGraph.edge_key(a, b)] = round(rng.uniform(0.5, 10), 2)
+    return names, [(u, v, w) for (u, v), w in edges.items()]
+
+
+def _graf_baru(names, edges, removed):
+    graph = TobaccoGraph()
+    for nama in names:
+        graph.titik.setdefault(nama, {})
+    graph.add_edges(e for e in edges if TobaccoGraph.edge_key(e[0], e[1]) not in removed)
+    return graph
+
+
+def test_remove_restore_edge_sama_dengan_dijkstra_baru():
+    rng = random.Random(7)
+    names, edges = _graf_acak(30, 70, seed=7)
+    graph = _graf_baru(names, edges, set())
+    # Semua baris cache diisi dulu supaya invalidasi per baris benar-benar teruji.
+    for a in names:
+        graph.distance(a, names[0])
+
+    removed = set()
+    for _ in range(60):
+        if removed and rng.random() < 0.4:
+            key = rng.choice(sorted(removed))
+            assert graph.restore_edge(*key)
+            removed.discard(key)
+        else:
+            u, v, _ = rng.choice(edges)
+            key = TobaccoGraph.edge_key(u, v)
+            assert graph.remove_edge(u, v) == (key not in removed)
+            removed.add(key)
+
+        # Graf baru tanpa riwayat cache sebagai pembanding.
+        fresh = _graf_baru(names, edges, removed)
+        for a in rng.sample(names, 8):
+            for b in names:
+                expected = fresh.distance(a, b)
+                assert graph.distance(a, b) == expected
+                path, jarak = graph.shortest_path(a, b)
+                if expected != float('inf'):
+                    assert path[0] == a and path[-1] == b
+                    assert abs(sum(graph.titik[x][y] for x, y in zip(path, path[1:])) - expected) < 1e-9